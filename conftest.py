@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def sync_thumbnails(settings):
+    # Варианты картинок строятся сразу: фоновый воркер писал бы
+    # во временный MEDIA_ROOT уже после того, как фикстура его удалила
+    settings.THUMBNAIL_BACKGROUND = False
@@ -0,0 +1,53 @@
+from django.core.files.storage import default_storage
+
+# Поля ответа и пути к ним для values(): в память попадают только
+# нужные столбцы, без объектов моделей. Поля ключа курсора
+# (pub_date, created, id) называются так же, как в модели
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'comment_count': 'comment_count',
+    'image': 'image',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+PROFILE_FIELDS = {
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'posts_count': 'stats__posts_count',
+    'followers_count': 'stats__followers_count',
+    'following_count': 'stats__following_count',
+}
+
+
+def values(queryset, fields):
+    return queryset.values(*fields.values())
+
+
+def project(row, fields):
+    return {name: row[lookup] for name, lookup in fields.items()}
+
+
+def post(row):
+    item = project(row, POST_FIELDS)
+    item['image'] = (
+        default_storage.url(item['image']) if item['image'] else None)
+    return item
+
+
+def comment(row):
+    return project(row, COMMENT_FIELDS)
+
+
+def profile(row):
+    return project(row, PROFILE_FIELDS)
@@ -0,0 +1,142 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+@override_settings(API_PAGE_SIZE=5)
+class ReadApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-group', description='Описание')
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author,
+                group=cls.group if number % 2 else None)
+            for number in range(7)]
+        cls.post = cls.posts[-1]
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Комментарий {number}')
+            for number in range(6)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def get_json(self, url, **params):
+        response = self.client.get(url, params)
+        content = (b''.join(response.streaming_content)
+                   if response.streaming else response.content)
+        return response, json.loads(content)
+
+    def collect(self, url):
+        """Проходит ленту по курсорам и возвращает все элементы."""
+        items, after = [], None
+        while True:
+            params = {'after': after} if after else {}
+            response, data = self.get_json(url, **params)
+            self.assertTrue(response.streaming)
+            items += data['results']
+            after = data['next']
+            if after is None:
+                return items
+
+    def test_index_cursor_pages(self):
+        items = self.collect(reverse('api:index'))
+        self.assertEqual([item['id'] for item in items],
+                         [post.id for post in reversed(ReadApiTest.posts)])
+        self.assertEqual(set(items[0]), {
+            'id', 'text', 'pub_date', 'author', 'group', 'comment_count',
+            'image'})
+        self.assertEqual(items[0]['author'], 'author')
+        self.assertEqual(items[0]['comment_count'], 6)
+
+    def test_group_and_profile_feeds(self):
+        group_items = self.collect(
+            reverse('api:group_posts', kwargs={'slug': 'test-group'}))
+        self.assertEqual({item['group'] for item in group_items},
+                         {'test-group'})
+        self.assertEqual(len(group_items), 3)
+        profile_items = self.collect(
+            reverse('api:profile_posts', kwargs={'username': 'author'}))
+        self.assertEqual(len(profile_items), 7)
+
+    def test_page_size_limit(self):
+        _, data = self.get_json(reverse('api:index'), limit=2)
+        self.assertEqual(len(data['results']), 2)
+        _, data = self.get_json(reverse('api:index'), limit='много')
+        self.assertEqual(len(data['results']), 5)
+
+    def test_profile(self):
+        _, data = self.get_json(
+            reverse('api:profile', kwargs={'username': 'author'}))
+        self.assertEqual(data, {
+            'username': 'author', 'first_name': 'Лев',
+            'last_name': 'Толстой', 'posts_count': 7,
+            'followers_count': 1, 'following_count': 0})
+
+    def test_post_with_comments(self):
+        kwargs = {'username': 'author', 'post_id': ReadApiTest.post.id}
+        _, data = self.get_json(reverse('api:post', kwargs=kwargs))
+        self.assertEqual(data['text'], 'Пост 6')
+        self.assertEqual(
+            [item['text'] for item in data['comments']],
+            [comment.text for comment in ReadApiTest.comments[:5]])
+        _, rest = self.get_json(reverse('api:comments', kwargs=kwargs),
+                                after=data['comments_next'])
+        self.assertEqual([item['id'] for item in rest['results']],
+                         [ReadApiTest.comments[5].id])
+        self.assertIsNone(rest['next'])
+
+    def test_not_found(self):
+        urls = [
+            reverse('api:group_posts', kwargs={'slug': 'missing'}),
+            reverse('api:profile', kwargs={'username': 'missing'}),
+            reverse('api:post', kwargs={'username': 'reader',
+                                        'post_id': ReadApiTest.post.id}),
+            reverse('api:comments', kwargs={'username': 'author',
+                                            'post_id': 0}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response, data = self.get_json(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertIn('detail', data)
+
+    def test_etag_revalidation(self):
+        """Неизменная лента отвечает 304, новый пост меняет ETag."""
+        url = reverse('api:profile_posts', kwargs={'username': 'author'})
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='Новый пост', author=ReadApiTest.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_shared_by_users(self):
+        """Ответ одинаков для всех, поэтому и ETag общий."""
+        url = reverse('api:index')
+        response = self.client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        reader = Client()
+        reader.force_login(ReadApiTest.reader)
+        response = reader.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_stream_without_queries(self):
+        """Запросы к базе выполняются во view, а не при чтении потока."""
+        response = self.client.get(reverse('api:index'))
+        with self.assertNumQueries(0):
+            data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['results']), 5)
@@ -0,0 +1,22 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('groups/<slug:slug>/posts/',
+         views.group_posts,
+         name='group_posts'),
+    path('users/<str:username>/', views.profile, name='profile'),
+    path('users/<str:username>/posts/',
+         views.profile_posts,
+         name='profile_posts'),
+    path('users/<str:username>/posts/<int:post_id>/',
+         views.post,
+         name='post'),
+    path('users/<str:username>/posts/<int:post_id>/comments/',
+         views.comments,
+         name='comments'),
+]
@@ -0,0 +1,134 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+
+from posts import freshness
+from posts.decorators import conditional_page
+from posts.models import Comment, Group, Post, User
+from posts.paginator import CursorPaginator
+
+from . import projections
+
+POST_KEYS = ('-pub_date', '-id')
+COMMENT_KEYS = ('created', 'id')
+
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def _json(data, status=200):
+    return JsonResponse(
+        data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def _not_found():
+    return _json({'detail': 'Не найдено'}, status=404)
+
+
+def _page_size(request):
+    default = getattr(settings, 'API_PAGE_SIZE', 20)
+    try:
+        size = int(request.GET.get('limit', default))
+    except ValueError:
+        size = default
+    return max(1, min(size, getattr(settings, 'API_MAX_PAGE_SIZE', 100)))
+
+
+def _stream(rows, next_cursor, project):
+    """
+    Выдает страницу по одной строке: {"results": [...], "next": курсор}.
+    Строки уже выбраны во view: поток читается после middleware, когда
+    метрики запроса и выбор реплики сброшены, поэтому в нем только
+    кодирование JSON.
+    """
+    yield '{"results":['
+    for position, row in enumerate(rows):
+        yield (',' if position else '') + _dumps(project(row))
+    yield f'],"next":{_dumps(next_cursor)}}}'
+
+
+def stream_page(request, queryset, project, keys=POST_KEYS):
+    """Потоковый ответ со страницей queryset после курсора ?after=."""
+    paginator = CursorPaginator(queryset, _page_size(request), keys=keys)
+    rows = list(paginator.window(after=request.GET.get('after')))
+    next_cursor = None
+    if len(rows) > paginator.per_page:
+        rows = rows[:paginator.per_page]
+        next_cursor = paginator.cursor_for(rows[-1])
+    return StreamingHttpResponse(
+        _stream(rows, next_cursor, project), content_type='application/json')
+
+
+def stream_posts(request, posts):
+    return stream_page(
+        request,
+        projections.values(posts, projections.POST_FIELDS),
+        projections.post)
+
+
+@conditional_page('api_index', freshness.index_scopes, private=False)
+def index(request):
+    return stream_posts(request, Post.objects.for_feed())
+
+
+@conditional_page('api_group', freshness.group_scopes, private=False)
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).first()
+    if group is None:
+        return _not_found()
+    return stream_posts(request, group.group_posts.for_feed())
+
+
+@conditional_page('api_profile', freshness.profile_scopes, private=False)
+def profile(request, username):
+    row = projections.values(
+        User.objects.filter(username=username),
+        projections.PROFILE_FIELDS).first()
+    if row is None:
+        return _not_found()
+    return _json(projections.profile(row))
+
+
+@conditional_page('api_profile_posts', freshness.profile_scopes, private=False)
+def profile_posts(request, username):
+    author = User.objects.filter(username=username).first()
+    if author is None:
+        return _not_found()
+    return stream_posts(request, author.posts.for_feed())
+
+
+@conditional_page('api_post', freshness.post_scopes, private=False)
+def post(request, username, post_id):
+    """Пост с первой страницей комментариев."""
+    row = projections.values(
+        Post.objects.for_feed().filter(
+            author__username=username, id=post_id),
+        projections.POST_FIELDS).first()
+    if row is None:
+        return _not_found()
+    paginator = CursorPaginator(
+        projections.values(Comment.objects.filter(post_id=post_id),
+                           projections.COMMENT_FIELDS),
+        _page_size(request), keys=COMMENT_KEYS)
+    comments = paginator.get_page()
+    return _json({
+        **projections.post(row),
+        'comments': [projections.comment(item) for item in comments],
+        'comments_next': paginator.next_cursor,
+    })
+
+
+@conditional_page('api_comments', freshness.post_scopes, private=False)
+def comments(request, username, post_id):
+    if not Post.objects.filter(
+            author__username=username, id=post_id).exists():
+        return _not_found()
+    return stream_page(
+        request,
+        projections.values(Comment.objects.filter(post_id=post_id),
+                           projections.COMMENT_FIELDS),
+        projections.comment,
+        keys=COMMENT_KEYS)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class MonitoringConfig(AppConfig):
+    name = 'monitoring'
+
+    def ready(self):
+        from .slow_queries import install
+        connection_created.connect(install)
@@ -0,0 +1,85 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .registry import registry
+
+_state = threading.local()
+
+
+class RequestStats:
+    __slots__ = ('view', 'queries', 'query_seconds', 'render_seconds')
+
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обертка connection.execute_wrapper: считает запросы и время."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def current():
+    """Статистика обрабатываемого запроса или None вне запроса."""
+    return getattr(_state, 'stats', None)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or 'unnamed'
+
+
+class MetricsMiddleware:
+    """
+    Собирает по имени URL время ответа, размер ответа, число и время
+    SQL-запросов и время рендера шаблонов. Ставится первым в MIDDLEWARE,
+    чтобы учитывать работу остальных middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = _state.stats = RequestStats()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _state.stats = None
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = current()
+        if stats is not None:
+            stats.view = view_name(request)
+
+    def record(self, request, response, stats, duration):
+        view = ('view', view_name(request))
+        labels = (view, ('method', request.method))
+        registry.inc('yatube_requests_total', labels + (
+            ('status', response.status_code),))
+        registry.observe('yatube_request_duration_seconds', labels, duration)
+        if not response.streaming:
+            registry.observe(
+                'yatube_response_size_bytes', labels, len(response.content))
+        registry.inc('yatube_db_queries_total', (view,), stats.queries)
+        registry.inc(
+            'yatube_db_query_seconds_total', (view,), stats.query_seconds)
+        registry.inc('yatube_template_render_seconds_total', (view,),
+                     stats.render_seconds)
+        registry.maybe_flush()
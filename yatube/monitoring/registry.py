@@ -0,0 +1,156 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Имя метрики: (тип, описание, границы корзин для гистограмм)
+METRICS = {
+    'yatube_requests_total': (
+        'counter', 'Обработанные запросы.', None),
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время ответа.', DURATION_BUCKETS),
+    'yatube_response_size_bytes': (
+        'histogram', 'Размер тела ответа.', SIZE_BUCKETS),
+    'yatube_db_queries_total': (
+        'counter', 'SQL-запросы, выполненные при ответе.', None),
+    'yatube_db_query_seconds_total': (
+        'counter', 'Суммарное время SQL-запросов.', None),
+    'yatube_template_render_seconds_total': (
+        'counter', 'Суммарное время рендера шаблонов.', None),
+}
+
+
+class Registry:
+    """
+    Метрики одного процесса. Счетчики — числа, гистограммы — списки
+    вида [корзина 1, ..., корзина N, +Inf, сумма, количество].
+
+    Если задан settings.METRICS_DIR, процесс периодически сбрасывает
+    свои значения в файл <pid>.json этой папки, а экспорт складывает
+    файлы всех воркеров.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.flushed_at = time.monotonic()
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = [0] * (len(buckets) + 3)
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return [[name, list(labels), value if isinstance(value, (
+                int, float)) else list(value)]
+                for (name, labels), value in self.values.items()]
+
+    def maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if time.monotonic() - self.flushed_at >= interval:
+            self.flush()
+
+    def flush(self):
+        directory = getattr(settings, 'METRICS_DIR', None)
+        self.flushed_at = time.monotonic()
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file_:
+            json.dump(self.snapshot(), file_)
+        # Замена атомарна: читатель не увидит недописанный файл
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Складывает значения всех процессов; свои берет из памяти."""
+        rows = self.snapshot()
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if directory and os.path.isdir(directory):
+            own = f'{os.getpid()}.json'
+            for name in os.listdir(directory):
+                if not name.endswith('.json') or name == own:
+                    continue
+                try:
+                    with open(os.path.join(directory, name)) as file_:
+                        rows.extend(json.load(file_))
+                except (OSError, ValueError):
+                    continue
+        merged = {}
+        for name, labels, value in rows:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(tuple(pair) for pair in labels))
+            current = merged.get(key)
+            if current is None:
+                merged[key] = value
+            elif isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(current, value)]
+            else:
+                merged[key] = current + value
+        return merged
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def render(merged):
+    """Текстовый формат Prometheus 0.0.4."""
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        series = sorted((labels, value) for (metric, labels), value
+                        in merged.items() if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), value):
+                cumulative += count
+                lines.append(f'{name}_bucket'
+                             f'{_labels(labels + (("le", bound),))} '
+                             f'{cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {value[-2]}')
+            lines.append(f'{name}_count{_labels(labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+atexit.register(registry.flush)
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.template.base import Template
+
+from .middleware import current
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_window_lock = threading.Lock()
+_window = {'started': 0.0, 'logged': 0, 'suppressed': 0}
+
+MONITORING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _allow():
+    """
+    Не больше SLOW_QUERY_LOG_RATE записей в минуту на процесс.
+    Возвращает (можно ли писать, сколько записей отброшено до этого).
+    """
+    limit = getattr(settings, 'SLOW_QUERY_LOG_RATE', 60)
+    now = time.monotonic()
+    with _window_lock:
+        if now - _window['started'] >= 60:
+            _window['started'] = now
+            _window['logged'] = 0
+        if _window['logged'] >= limit:
+            _window['suppressed'] += 1
+            return False, 0
+        _window['logged'] += 1
+        suppressed, _window['suppressed'] = _window['suppressed'], 0
+        return True, suppressed
+
+
+def _origin():
+    """
+    Ищет в стеке вызовов шаблон, который сейчас рендерится, и ближайшую
+    строку кода проекта. Вызывается только для медленных запросов.
+    """
+    template = caller = None
+    project = settings.BASE_DIR
+    # Тестовое окружение подменяет Template._render, поэтому код
+    # метода берется в момент вызова
+    render_code = Template._render.__code__
+    frame = sys._getframe(1)
+    while frame is not None and (template is None or caller is None):
+        code = frame.f_code
+        if template is None and code is render_code:
+            template = frame.f_locals['self'].name
+        filename = code.co_filename
+        if (caller is None and filename.startswith(project)
+                and not filename.startswith(MONITORING_DIR)):
+            caller = '{}:{} in {}'.format(
+                os.path.relpath(filename, project), frame.f_lineno,
+                code.co_name)
+        frame = frame.f_back
+    return template, caller
+
+
+def _explain(connection, sql, params):
+    if not connection.features.supports_explaining_query_execution:
+        return None
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return [' '.join(str(column) for column in row)
+                    for row in cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error}']
+    finally:
+        _local.explaining = False
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """
+    Обертка выполнения запросов: запросы дольше SLOW_QUERY_THRESHOLD_MS
+    пишутся в лог одной JSON-строкой вместе с планом выполнения.
+    """
+    if getattr(_local, 'explaining', False):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = (time.perf_counter() - start) * 1000
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    if threshold is not None and elapsed >= threshold:
+        _log(context['connection'], sql, params, many, elapsed)
+    return result
+
+
+def _log(connection, sql, params, many, elapsed):
+    allowed, suppressed = _allow()
+    if not allowed:
+        return
+    template, caller = _origin()
+    stats = current()
+    entry = {
+        'time': time.time(),
+        'duration_ms': round(elapsed, 3),
+        'database': connection.alias,
+        'sql': sql,
+        'params': None if many else params,
+        'view': stats.view if stats is not None else None,
+        'template': template,
+        'caller': caller,
+        'plan': None if many else _explain(connection, sql, params),
+        'suppressed': suppressed,
+    }
+    logger.warning(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает обертку к соединению."""
+    if log_slow_queries not in connection.execute_wrappers:
+        # Первой в списке, то есть ближе всех к базе: в замер не входит
+        # работа других оберток
+        connection.execute_wrappers.insert(0, log_slow_queries)
@@ -0,0 +1,38 @@
+import time
+
+from django.template.backends.django import DjangoTemplates
+
+from .middleware import current
+
+
+class TimedTemplate:
+    """Шаблон, который добавляет время рендера к статистике запроса."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = current()
+        if stats is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.render_seconds += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Бэкенд DjangoTemplates с замером рендера. Включенные через include
+    шаблоны рендерятся внутри родительского и входят в его время.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from monitoring.registry import Registry, registry, render
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        registry.reset()
+        cache.clear()
+        self.client = Client()
+
+    def metrics(self, **headers):
+        return self.client.get(reverse('monitoring:metrics'), **headers)
+
+    def test_request_metrics_by_view(self):
+        """Запрос к index попадает в метрики под именем URL."""
+        self.client.get(reverse('index'))
+        body = self.metrics().content.decode()
+        self.assertIn(
+            'yatube_requests_total{view="index",method="GET",status="200"} 1',
+            body)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="index",method="GET",le="+Inf"} 1', body)
+        self.assertIn('yatube_response_size_bytes_count'
+                      '{view="index",method="GET"} 1', body)
+        self.assertRegex(
+            body, r'yatube_db_queries_total\{view="index"\} [1-9]')
+        self.assertRegex(
+            body, r'yatube_template_render_seconds_total\{view="index"\} '
+                  r'0\.\d*[1-9]')
+
+    def test_unmatched_urls_share_label(self):
+        """Несуществующие адреса не плодят отдельных серий."""
+        self.client.get('/group/missing/')
+        self.client.get('/no/such/page/at/all/')
+        body = self.metrics().content.decode()
+        self.assertIn('view="group"', body)
+        self.assertIn('view="unmatched"', body)
+        self.assertNotIn('missing', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        """С заданным токеном метрики отдаются только с ним."""
+        self.assertEqual(self.metrics().status_code, 403)
+        response = self.metrics(HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class RegistryTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Корзины гистограммы выводятся нарастающим итогом."""
+        local = Registry()
+        labels = (('view', 'index'), ('method', 'GET'))
+        for value in (0.001, 0.02, 20):
+            local.observe('yatube_request_duration_seconds', labels, value)
+        body = render(local.collect())
+        self.assertIn('le="0.005"} 1', body)
+        self.assertIn('le="0.025"} 2', body)
+        self.assertIn('le="10"} 2', body)
+        self.assertIn('le="+Inf"} 3', body)
+        self.assertIn('yatube_request_duration_seconds_count'
+                      '{view="index",method="GET"} 3', body)
+
+    def test_processes_aggregated_through_directory(self):
+        """Значения других воркеров берутся из общей папки."""
+        labels = [['view', 'index']]
+        with open(os.path.join(self.directory, '1.json'), 'w') as file_:
+            json.dump([['yatube_db_queries_total', labels, 5]], file_)
+        with override_settings(METRICS_DIR=self.directory):
+            local = Registry()
+            local.inc('yatube_db_queries_total', (('view', 'index'),), 2)
+            local.flush()
+            self.assertTrue(os.path.exists(
+                os.path.join(self.directory, f'{os.getpid()}.json')))
+            body = render(local.collect())
+        self.assertIn('yatube_db_queries_total{view="index"} 7', body)
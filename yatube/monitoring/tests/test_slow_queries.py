@@ -0,0 +1,68 @@
+import json
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from monitoring import slow_queries
+from posts.models import Comment, Post, User
+
+
+class SlowQueryLogTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Текст поста', author=cls.author)
+        Comment.objects.create(
+            post=cls.post, author=cls.author, text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        slow_queries._window.update(started=0.0, logged=0, suppressed=0)
+        self.client = Client()
+
+    @contextmanager
+    def capture(self):
+        with self.settings(SLOW_QUERY_THRESHOLD_MS=0):
+            with self.assertLogs('monitoring.slow_queries') as logs:
+                yield logs
+
+    def entries(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_entry_has_view_caller_and_plan(self):
+        """Запись содержит SQL, параметры, view, место вызова и план."""
+        with self.capture() as logs:
+            self.client.get(reverse('index'))
+        entry = next(entry for entry in self.entries(logs)
+                     if 'posts_post' in entry['sql'])
+        self.assertEqual(entry['view'], 'index')
+        self.assertIn('posts/', entry['caller'])
+        self.assertIsInstance(entry['params'], list)
+        self.assertTrue(entry['plan'])
+        self.assertGreaterEqual(entry['duration_ms'], 0)
+
+    def test_template_of_lazy_query(self):
+        """Для запроса из шаблона указывается шаблон."""
+        with self.capture() as logs:
+            render_to_string('includes/comment_list.html', {
+                'post': self.post,
+                'comments': self.post.comments.select_related('author')})
+        comments = [entry for entry in self.entries(logs)
+                    if 'posts_comment' in entry['sql']]
+        self.assertTrue(comments)
+        self.assertTrue(all(entry['template'] for entry in comments))
+
+    @override_settings(SLOW_QUERY_LOG_RATE=2)
+    def test_rate_limit(self):
+        """Сверх лимита записи отбрасываются и учитываются в следующей."""
+        with self.capture() as logs:
+            for _ in range(5):
+                list(Post.objects.all())
+            slow_queries._window['started'] = 0.0
+            list(Post.objects.all())
+        entries = self.entries(logs)
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[-1]['suppressed'], 3)
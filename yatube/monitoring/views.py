@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .registry import registry, render
+
+
+def metrics(request):
+    """Метрики всех воркеров в текстовом формате Prometheus."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and not constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
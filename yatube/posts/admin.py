@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Comment, Follow, Group, Post
+from .search import get_backend
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -9,6 +10,11 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date", "group")
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_backend().filter(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ("title", "description")
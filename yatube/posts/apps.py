@@ -1,5 +1,22 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search(sender, using, **kwargs):
+    # Перестройка таблицы posts_post в SQLite удаляет ее триггеры,
+    # поэтому после каждой миграции поиск переустанавливается.
+    from django.db import connections
+
+    from .search import get_backend
+    get_backend(connections[using]).install()
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import pragmas
+        from . import signals  # noqa: F401
+        connection_created.connect(pragmas.apply)
+        post_migrate.connect(install_search, sender=self)
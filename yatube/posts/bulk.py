@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import feed_cache, stats, timeline
+from .models import Comment, Post
+
+
+@contextmanager
+def preserved_timestamps(*fields):
+    """Не дает auto_now_add затереть заданные даты при bulk_create."""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+def post_timestamps():
+    return preserved_timestamps(
+        Post._meta.get_field('pub_date'),
+        Comment._meta.get_field('created'))
+
+
+def refresh_derived():
+    """
+    Пересчитывает то, что обычно поддерживают сигналы: счетчики
+    комментариев и авторов, ленты подписок и версии кэша лент.
+    Нужен после загрузки через bulk_create, который сигналы не шлет.
+    """
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(
+        total=Count('pk')
+    ).values('total')
+    Post.objects.update(comment_count=Coalesce(
+        Subquery(comments, output_field=IntegerField()), 0))
+    stats.reconcile()
+    timeline.rebuild()
+    feed_cache.bump('groups', 'index')
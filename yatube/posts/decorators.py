@@ -1,6 +1,13 @@
 from functools import wraps
 
 from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from yatube import db_router
+
+from . import page_cache
+from .freshness import validators
 
 
 def only_author(func):
@@ -10,3 +17,53 @@ def only_author(func):
             return func(request, *args, **kwargs)
         return redirect('post', *args, **kwargs)
     return check_user
+
+
+def conditional_page(name, scopes_func, private=True):
+    """
+    Отвечает 304 Not Modified, если у клиента свежая копия страницы,
+    не выполняя основных запросов view и рендера шаблона.
+    """
+    def etag(request, **kwargs):
+        return validators(request, name, scopes_func, kwargs, private)[0]
+
+    def last_modified(request, **kwargs):
+        return validators(request, name, scopes_func, kwargs, private)[1]
+
+    # Копия всегда сверяется с сервером. Персональную страницу нельзя
+    # хранить в общих кэшах, общий для всех документ — можно
+    visibility = {'private': True} if private else {'public': True}
+
+    def decorator(func):
+        def render(request, *args, **kwargs):
+            reads = db_router.replica_reads()
+            response = func(request, *args, **kwargs)
+            response.from_replica = db_router.replica_reads() > reads
+            return response
+
+        conditional = condition(etag, last_modified)(render)
+
+        @wraps(func)
+        def check_freshness(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            if getattr(response, 'from_replica', False):
+                # Страница с отстающей реплики может не соответствовать
+                # текущим версиям: такую копию клиенту не закрепляем
+                for header in ('ETag', 'Last-Modified'):
+                    if response.has_header(header):
+                        del response[header]
+            patch_cache_control(response, no_cache=True, **visibility)
+            return response
+        return check_freshness
+    return decorator
+
+
+def cached_shell(name, scopes_func):
+    """Отдает страницу из общей оболочки, см. page_cache.serve."""
+    def decorator(func):
+        @wraps(func)
+        def serve_shell(request, *args, **kwargs):
+            return page_cache.serve(
+                func, name, scopes_func, request, *args, **kwargs)
+        return serve_shell
+    return decorator
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from yatube import db_router
+
+KEY_PREFIX = 'feed_version'
+
+
+def _key(scope):
+    return f'{KEY_PREFIX}:{scope}'
+
+
+def _timeout():
+    # None — версии живут, пока их не сдвинут
+    return getattr(settings, 'FEED_VERSION_TIMEOUT', None)
+
+
+def bump(*scopes):
+    """
+    Сдвигает версии областей ленты. Старые фрагменты с прежней версией
+    в ключе больше не читаются и вытесняются по TTL.
+
+    Внутри транзакции версии сдвигаются еще раз после коммита: читатель,
+    успевший до коммита закэшировать старые данные под новой версией,
+    иначе отдавал бы их до истечения FEED_CACHE_TIMEOUT.
+    """
+    def set_versions():
+        now = time.time()
+        cache.set_many({_key(scope): now for scope in scopes if scope},
+                       _timeout())
+
+    set_versions()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(set_versions)
+
+
+def versions(*scopes):
+    """Возвращает версии областей, заводя отсутствующие."""
+    keys = [_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, _timeout())
+        found.update(cache.get_many(list(missing)))
+    return [found.get(key, missing.get(key)) for key in keys]
+
+
+def version(*scopes):
+    """Общая версия фрагмента, зависящего от нескольких областей."""
+    return '-'.join(
+        f'{value:.6f}' for value in versions('groups', *scopes))
+
+
+def context(*scopes):
+    # Фрагменты, собранные с реплики, в кэш не кладутся (таймаут 0):
+    # под текущей версией они пережили бы отставание реплики
+    timeout = (0 if db_router.reading_replica()
+               else getattr(settings, 'FEED_CACHE_TIMEOUT', 3600))
+    return {
+        'feed_version': version(*scopes),
+        'feed_cache_timeout': timeout,
+    }
+
+
+def post_scopes(post, *extra_group_ids):
+    group_ids = {post.group_id, *extra_group_ids} - {None}
+    return ['index', f'author:{post.author_id}', f'post:{post.pk}',
+            *(f'group:{group_id}' for group_id in group_ids)]
+
+
+def stats_scopes(follow):
+    """Подписка меняет счетчики и кнопку подписки у обоих пользователей."""
+    return [f'stats:{follow.user_id}', f'stats:{follow.author_id}']
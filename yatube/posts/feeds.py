@@ -0,0 +1,121 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from . import freshness
+from .decorators import cached_shell, conditional_page
+from .models import Group, Post, User
+
+feed_items = 20
+
+
+class LatestPostsFeed(Feed):
+    """Последние записи сайта в RSS."""
+
+    def title(self, obj):
+        return 'Yatube: последние записи'
+
+    def description(self, obj):
+        return 'Новые записи всех авторов'
+
+    def link(self, obj):
+        return reverse('index')
+
+    def subtitle(self, obj):
+        # Atom берет описание ленты отсюда
+        return self.description(obj)
+
+    def posts(self, obj):
+        return Post.objects.for_feed()
+
+    def items(self, obj):
+        return self.posts(obj).order_by('-pub_date', '-id')[:feed_items]
+
+    def item_title(self, item):
+        return Truncator(item.text).chars(60)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('post', args=[item.author.username, item.id])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('group', args=[group.slug])
+
+    def posts(self, group):
+        return group.group_posts.for_feed()
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи автора @{author.username}'
+
+    def link(self, author):
+        return reverse('profile', args=[author.username])
+
+    def posts(self, author):
+        return author.posts.for_feed()
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+
+def feed_view(feed, name, scopes_func):
+    """
+    Лента одна для всех читателей: готовый документ хранится в кэше
+    оболочек до нового поста, а опрос свежей ленты получает 304.
+    """
+    return conditional_page(name, scopes_func, private=False)(
+        cached_shell(name, scopes_func)(feed))
+
+
+index_rss = feed_view(
+    LatestPostsFeed(), 'index_rss', freshness.index_scopes)
+index_atom = feed_view(
+    LatestPostsAtomFeed(), 'index_atom', freshness.index_scopes)
+group_rss = feed_view(
+    GroupPostsFeed(), 'group_rss', freshness.group_scopes)
+group_atom = feed_view(
+    GroupPostsAtomFeed(), 'group_atom', freshness.group_scopes)
+profile_rss = feed_view(
+    AuthorPostsFeed(), 'profile_rss', freshness.profile_scopes)
+profile_atom = feed_view(
+    AuthorPostsAtomFeed(), 'profile_atom', freshness.profile_scopes)
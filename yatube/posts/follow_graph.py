@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from yatube import db_router
+
+from . import feed_cache
+from .models import Follow
+
+
+def _key(user_id):
+    # Подписка и отписка сдвигают версию stats:<id> подписчика
+    version = feed_cache.version(f'stats:{user_id}')
+    return f'follow_graph:{user_id}:{version}'
+
+
+def followees(user):
+    """
+    Множество id авторов, на которых подписан пользователь. Читается
+    из общего кэша одним запросом на версию подписок и запоминается
+    на объекте пользователя до конца запроса.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, '_followees'):
+        key = _key(user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            with db_router.primary():
+                ids = frozenset(Follow.objects.filter(
+                    user_id=user.pk).values_list('author_id', flat=True))
+            cache.set(key, ids, getattr(
+                settings, 'FEED_CACHE_TIMEOUT', 3600))
+        user._followees = ids
+    return user._followees
+
+
+def _author_id(author):
+    return getattr(author, 'pk', author)
+
+
+def is_following(user, authors):
+    """Словарь {id автора: подписан ли пользователь} для многих авторов."""
+    ids = followees(user)
+    return {_author_id(author): _author_id(author) in ids
+            for author in authors}
+
+
+def follows(user, author):
+    return is_following(user, [author])[_author_id(author)]
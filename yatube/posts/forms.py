@@ -1,7 +1,9 @@
 from django import forms
 from django.forms.models import ModelForm
+from django.template.defaultfilters import filesizeformat
 
 from .models import Comment, Post
+from .uploads import bound_image, max_bytes
 
 
 class PostForm(ModelForm):
@@ -9,6 +11,26 @@ class PostForm(ModelForm):
         model = Post
         fields = ['text', 'group', 'image']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.oversized_image = getattr(
+            self.files.get('image'), 'oversized', False)
+        if self.oversized_image:
+            # Усеченный файл не отдаем ImageField: он бы его декодировал
+            self.files = self.files.copy()
+            self.files.pop('image')
+
+    def clean_image(self):
+        if self.oversized_image:
+            raise forms.ValidationError(
+                'Файл больше %(limit)s.',
+                code='file_too_large',
+                params={'limit': filesizeformat(max_bytes())})
+        image = self.cleaned_data['image']
+        if image and 'image' in self.changed_data:
+            return bound_image(image)
+        return image
+
     def clean_text(self):
         data = self.cleaned_data['text']
         if data == '':
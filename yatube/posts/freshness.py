@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime, timezone
+
+from . import feed_cache
+from .models import Group, Post, User
+
+
+def index_scopes(request):
+    return ['index']
+
+
+def group_scopes(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True).first()
+    return None if group_id is None else [f'group:{group_id}']
+
+
+def profile_scopes(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True).first()
+    if author_id is None:
+        return None
+    return [f'author:{author_id}', f'stats:{author_id}']
+
+
+def post_scopes(request, username, post_id):
+    author_id = Post.objects.filter(
+        pk=post_id, author__username=username).values_list(
+        'author_id', flat=True).first()
+    if author_id is None:
+        return None
+    # Карточка автора показывает число его постов и подписчиков
+    return [f'post:{post_id}', f'author:{author_id}', f'stats:{author_id}']
+
+
+def page_stamps(request, scopes_func, kwargs):
+    """
+    Версии областей кэша лент, из которых собрана страница, или None,
+    если ее объекта нет. Версии — метки времени последних изменений,
+    они лежат в кэше, поэтому проверка не трогает посты и комментарии.
+    Результат запоминается на запросе.
+    """
+    if not hasattr(request, '_page_stamps'):
+        scopes = scopes_func(request, **kwargs)
+        request._page_stamps = (
+            None if scopes is None
+            else feed_cache.versions('groups', *scopes))
+    return request._page_stamps
+
+
+def validators(request, name, scopes_func, kwargs, private=True):
+    """
+    ETag и Last-Modified страницы; condition() вызывает обе функции.
+    Общие для всех документы (private=False) получают один ETag.
+    """
+    stamps = page_stamps(request, scopes_func, kwargs)
+    if stamps is None:
+        # Объекта нет: пусть view ответит 404 как обычно
+        return None, None
+    parts = [name, *(f'{stamp:.6f}' for stamp in stamps)]
+    if private:
+        # Страница отличается для каждого пользователя: имя в меню,
+        # кнопка подписки, форма комментария. В форме лежит CSRF-токен,
+        # а он меняется при каждом входе: копия со старым дала бы 403
+        user = request.user.pk if request.user.is_authenticated else 'anon'
+        parts[1:1] = [str(user), request.META.get('CSRF_COOKIE', '')]
+    key = ':'.join(parts)
+    etag = hashlib.md5(key.encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(max(stamps), tz=timezone.utc)
+    return etag, last_modified
@@ -0,0 +1,129 @@
+import json
+import math
+import time
+from statistics import mean
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import (CaptureQueriesContext,
+                               setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow, Group, Post, User
+
+
+def percentile(values, share):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(share * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку и число SQL-запросов основных страниц '
+            'через тестовый клиент и сохраняет результат в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Запросов на каждую страницу.')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.')
+        parser.add_argument(
+            '--output', default=None,
+            help='Файл для результатов в формате JSON.')
+        parser.add_argument(
+            '--label', default='',
+            help='Метка прогона, например хэш коммита.')
+
+    def targets(self):
+        """Страницы для замера: самые нагруженные объекты в базе."""
+        post = Post.objects.order_by('-comment_count', '-pk').first()
+        if post is None:
+            raise CommandError(
+                'В базе нет постов: запустите generate_dataset.')
+        author = User.objects.annotate(
+            total=Count('posts')).order_by('-total').first()
+        group = Group.objects.annotate(
+            total=Count('group_posts')).order_by('-total').first()
+        reader = User.objects.filter(
+            pk=Follow.objects.values('user').annotate(
+                total=Count('pk')).order_by('-total').values('user')[:1]
+        ).first() or author
+        targets = [
+            ('index', reverse('index'), None),
+            ('profile', reverse(
+                'profile', kwargs={'username': author.username}), None),
+            ('post', reverse('post', kwargs={
+                'username': post.author.username, 'post_id': post.pk}),
+             None),
+            ('follow_index', reverse('follow_index'), reader),
+        ]
+        if group is not None:
+            targets.insert(1, ('group_posts', reverse(
+                'group', kwargs={'slug': group.slug}), None))
+        return targets
+
+    def measure(self, client, url, requests, cold):
+        timings, queries = [], []
+        for _ in range(requests):
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(
+                    f'{url} ответил кодом {response.status_code}.')
+            queries.append(len(captured))
+        return {
+            'url': url,
+            'requests': requests,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(mean(timings), 3),
+            'queries_max': max(queries),
+            'queries_mean': round(mean(queries), 2),
+        }
+
+    def handle(self, *args, requests, cold, output, label, **options):
+        # Тестовое окружение добавляет testserver в ALLOWED_HOSTS;
+        # при запуске из тестов оно уже настроено
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            own_environment = False
+        try:
+            results = {}
+            for name, url, user in self.targets():
+                client = Client()
+                if user is not None:
+                    client.force_login(user)
+                results[name] = self.measure(client, url, requests, cold)
+        finally:
+            if own_environment:
+                teardown_test_environment()
+        report = {
+            'label': label,
+            'created': timezone.now().isoformat(),
+            'cold_cache': cold,
+            'database': connection.vendor,
+            'views': results,
+        }
+        self.stdout.write(f'{"страница":<14}{"p50, мс":>10}{"p95, мс":>10}'
+                          f'{"запросов":>10}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<14}{result["p50_ms"]:>10.2f}'
+                f'{result["p95_ms"]:>10.2f}{result["queries_max"]:>10}')
+        if output:
+            with open(output, 'w', encoding='utf-8') as file_:
+                json.dump(report, file_, ensure_ascii=False, indent=2)
@@ -0,0 +1,81 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Follow, Group, Post, User
+
+CHUNK_SIZE = 2000
+
+# Порядок важен: при импорте ссылки должны указывать на уже
+# загруженные строки. Пользователь и группа ссылаются по естественным
+# ключам (username, slug). У постов он неуникален, поэтому выгружается
+# исходный id: импорт выдаст посту новый и сопоставит их в ImportedPost,
+# а комментарии найдут свой пост по этому сопоставлению.
+EXPORTS = (
+    ('user', User.objects.order_by('pk'), {
+        'username': 'username',
+        'password': 'password',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email',
+        'is_active': 'is_active',
+        'is_staff': 'is_staff',
+        'is_superuser': 'is_superuser',
+        'date_joined': 'date_joined',
+    }),
+    ('group', Group.objects.order_by('pk'), {
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+    }),
+    ('post', Post.objects.order_by('pk'), {
+        'id': 'pk',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'image_variants': 'image_variants',
+    }),
+    ('comment', Comment.objects.order_by('pk'), {
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }),
+    ('follow', Follow.objects.order_by('pk'), {
+        'user': 'user__username',
+        'author': 'author__username',
+    }),
+)
+
+
+class Command(BaseCommand):
+    help = ('Выгружает пользователей, группы, посты, комментарии и '
+            'подписки в JSON Lines потоком, без загрузки в память.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки, по умолчанию stdout.')
+
+    def handle(self, *args, path='-', **options):
+        output = (sys.stdout if path == '-'
+                  else open(path, 'w', encoding='utf-8'))
+        written = 0
+        try:
+            for model, queryset, fields in EXPORTS:
+                # default=str сохраняет микросекунды дат: от них
+                # зависит порядок курсорной пагинации
+                rows = queryset.values_list(*fields.values())
+                for row in rows.iterator(chunk_size=CHUNK_SIZE):
+                    output.write(json.dumps(
+                        {'model': model, 'fields': dict(zip(fields, row))},
+                        default=str, ensure_ascii=False))
+                    output.write('\n')
+                    written += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(f'Выгружено строк: {written}.')
@@ -0,0 +1,149 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts import bulk
+from posts.models import Comment, Follow, Group, Post, User
+
+BATCH_SIZE = 1000
+
+
+def power_law(count, exponent):
+    """Накопленные веса закона Ципфа: i-й по активности ~ 1 / i**exponent."""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, группами, '
+            'постами, подписками и комментариями. Авторство постов и '
+            'популярность авторов распределены по степенному закону.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.')
+        parser.add_argument('--comments', type=int, default=40000)
+        parser.add_argument(
+            '--exponent', type=float, default=1.1,
+            help='Показатель степенного закона активности авторов.')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить публикации.')
+        parser.add_argument(
+            '--password', default='password',
+            help='Пароль всех созданных пользователей.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        if options['seed'] is not None:
+            self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.period = timedelta(days=options['days'])
+
+        user_ids = self.create_users(options['users'], options['password'])
+        group_ids = self.create_groups(options['groups'])
+        # Самые активные авторы — они же самые читаемые
+        self.random.shuffle(user_ids)
+        weights = power_law(len(user_ids), options['exponent'])
+        with bulk.post_timestamps():
+            post_ids = self.create_posts(
+                options['posts'], user_ids, weights, group_ids)
+            self.create_comments(
+                options['comments'], post_ids, user_ids)
+        self.create_follows(options['follows'], user_ids, weights)
+        bulk.refresh_derived()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, групп '
+            f'{len(group_ids)}, постов {len(post_ids)}.'))
+
+    def insert(self, model, objects):
+        """Вставляет объекты пачками, по транзакции на пачку."""
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= BATCH_SIZE:
+                self.flush(model, batch)
+                batch = []
+        if batch:
+            self.flush(model, batch)
+
+    def flush(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def moment(self):
+        return self.now - self.period * self.random.random()
+
+    def create_users(self, count, password):
+        prefix = f'user{self.random.randrange(16 ** 6):06x}'
+        usernames = [f'{prefix}_{number}' for number in range(count)]
+        password = make_password(password)
+        self.insert(User, (
+            User(username=username, password=password,
+                 first_name=self.fake.first_name(),
+                 last_name=self.fake.last_name(),
+                 email=f'{username}@example.com',
+                 date_joined=self.now - self.period)
+            for username in usernames))
+        return list(User.objects.filter(
+            username__in=usernames).values_list('pk', flat=True))
+
+    def create_groups(self, count):
+        prefix = f'group-{self.random.randrange(16 ** 6):06x}'
+        slugs = [f'{prefix}-{number}' for number in range(count)]
+        self.insert(Group, (
+            Group(title=self.fake.sentence(nb_words=3).rstrip('.'),
+                  slug=slug, description=self.fake.paragraph())
+            for slug in slugs))
+        return list(Group.objects.filter(
+            slug__in=slugs).values_list('pk', flat=True))
+
+    def create_posts(self, count, user_ids, weights, group_ids):
+        last_id = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+        authors = self.random.choices(user_ids, cum_weights=weights, k=count)
+        self.insert(Post, (
+            Post(text=self.fake.text(max_nb_chars=600),
+                 author_id=author_id,
+                 group_id=(self.random.choice(group_ids)
+                           if group_ids and self.random.random() < 0.5
+                           else None),
+                 pub_date=self.moment())
+            for author_id in authors))
+        return list(Post.objects.filter(
+            pk__gt=last_id).values_list('pk', flat=True))
+
+    def create_comments(self, count, post_ids, user_ids):
+        if not post_ids:
+            return
+        # Обсуждают в основном немногие посты
+        weights = power_law(len(post_ids), 1.0)
+        posts = self.random.choices(post_ids, cum_weights=weights, k=count)
+        self.insert(Comment, (
+            Comment(post_id=post_id,
+                    author_id=self.random.choice(user_ids),
+                    text=self.fake.sentence(nb_words=12),
+                    created=self.moment())
+            for post_id in posts))
+
+    def create_follows(self, per_user, user_ids, weights):
+        def follows():
+            for user_id in user_ids:
+                count = min(per_user, len(user_ids) - 1)
+                authors = set(self.random.choices(
+                    user_ids, cum_weights=weights, k=count))
+                for author_id in authors - {user_id}:
+                    yield Follow(user_id=user_id, author_id=author_id)
+        self.insert(Follow, follows())
@@ -0,0 +1,182 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from posts import bulk
+from posts.models import Comment, Follow, Group, ImportedPost, Post, User
+
+
+def _ids(model, key, values):
+    values = set(values) - {None}
+    if not values:
+        return {}
+    return dict(model.objects.filter(
+        **{f'{key}__in': values}).values_list(key, 'pk'))
+
+
+def _imported(source, source_pks):
+    """Новые id уже загруженных из этой выгрузки постов."""
+    return dict(ImportedPost.objects.filter(
+        source=source, source_pk__in=set(source_pks) - {None},
+    ).values_list('source_pk', 'post_id'))
+
+
+def build_users(rows, source):
+    users = []
+    for fields in rows:
+        fields['date_joined'] = parse_datetime(fields['date_joined'])
+        users.append(User(**fields))
+    return [(User, users)]
+
+
+def build_groups(rows, source):
+    return [(Group, [Group(**fields) for fields in rows])]
+
+
+def build_posts(rows, source):
+    """
+    Посты получают новые первичные ключи подряд за текущим максимумом,
+    а соответствие id из выгрузки новому id сохраняется в ImportedPost.
+    Уже загруженные из этой выгрузки посты пропускаются, поэтому
+    повторная загрузка не плодит дубли.
+    """
+    for fields in rows:
+        fields['pub_date'] = parse_datetime(fields['pub_date'])
+    authors = _ids(User, 'username', (row['author'] for row in rows))
+    groups = _ids(Group, 'slug', (row['group'] for row in rows))
+    loaded = set(_imported(source, (row['id'] for row in rows)))
+    next_pk = (Post.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+    posts, links = [], []
+    for fields in rows:
+        source_pk = fields.pop('id')
+        fields['author_id'] = authors.get(fields.pop('author'))
+        fields['group_id'] = groups.get(fields.pop('group'))
+        if fields['author_id'] is not None and source_pk not in loaded:
+            loaded.add(source_pk)
+            posts.append(Post(pk=next_pk, **fields))
+            links.append(ImportedPost(
+                source=source, source_pk=source_pk, post_id=next_pk))
+            next_pk += 1
+    return [(Post, posts), (ImportedPost, links)]
+
+
+def build_comments(rows, source):
+    """
+    Комментарии привязываются к постам через ImportedPost и
+    пропускаются, если у поста уже есть такой (автор и время).
+    """
+    for fields in rows:
+        fields['created'] = parse_datetime(fields['created'])
+    authors = _ids(User, 'username', (row['author'] for row in rows))
+    posts = _imported(source, (row['post'] for row in rows))
+    loaded = set(Comment.objects.filter(
+        post_id__in=set(posts.values()),
+        created__in={row['created'] for row in rows},
+    ).values_list('post_id', 'author_id', 'created'))
+    comments = []
+    for fields in rows:
+        fields['post_id'] = posts.get(fields.pop('post'))
+        fields['author_id'] = authors.get(fields.pop('author'))
+        key = (fields['post_id'], fields['author_id'], fields['created'])
+        if None not in key and key not in loaded:
+            loaded.add(key)
+            comments.append(Comment(**fields))
+    return [(Comment, comments)]
+
+
+def build_follows(rows, source):
+    users = _ids(User, 'username', (
+        name for row in rows for name in (row['user'], row['author'])))
+    follows = [
+        Follow(user_id=users.get(row['user']),
+               author_id=users.get(row['author']))
+        for row in rows]
+    return [(Follow, [follow for follow in follows
+                      if follow.user_id and follow.author_id])]
+
+
+BUILDERS = {
+    'user': build_users,
+    'group': build_groups,
+    'post': build_posts,
+    'comment': build_comments,
+    'follow': build_follows,
+}
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_jsonl пачками через bulk_create. '
+            'Память не зависит от размера файла; после сбоя загрузку '
+            'можно продолжить с флагом --resume.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл JSON Lines.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Строк в одной транзакции.')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с места, сохраненного в <path>.state.')
+        parser.add_argument(
+            '--source',
+            help='Имя выгрузки для сопоставления id постов, по умолчанию '
+                 'имя файла. Повторная загрузка с тем же именем '
+                 'пропускает уже загруженные посты.')
+
+    def handle(self, *args, path, batch_size, resume, source=None,
+               **options):
+        source = source or os.path.basename(path)
+        state_path = f'{path}.state'
+        offset = 0
+        if resume and os.path.exists(state_path):
+            with open(state_path) as state:
+                offset = json.load(state)['offset']
+        loaded = 0
+        with open(path, 'rb') as dump, bulk.post_timestamps():
+            dump.seek(offset)
+            model, batch = None, []
+            for line in iter(dump.readline, b''):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['model'] not in BUILDERS:
+                    raise CommandError(
+                        f'Неизвестная модель: {record["model"]}')
+                if batch and (record['model'] != model
+                              or len(batch) >= batch_size):
+                    loaded += self.flush(model, batch, dump.tell() - len(
+                        line), state_path, source)
+                    batch = []
+                model = record['model']
+                batch.append(record['fields'])
+            if batch:
+                loaded += self.flush(
+                    model, batch, dump.tell(), state_path, source)
+        bulk.refresh_derived()
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        self.stdout.write(self.style.SUCCESS(f'Загружено строк: {loaded}.'))
+
+    def flush(self, model, rows, offset, state_path, source):
+        with transaction.atomic():
+            batches = BUILDERS[model](rows, source)
+            for model_class, objects in batches:
+                # Посты вставляются с заранее выбранными id: конфликт
+                # должен откатить пачку, а не молча потерять пост
+                model_class.objects.bulk_create(
+                    objects, ignore_conflicts=model_class is not Post)
+            # Как loaddata: после явных id сдвигаем последовательности
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                        no_style(), [Post]):
+                    cursor.execute(sql)
+        # Смещение пишется только после фиксации пачки: при повторе
+        # пачка загрузится заново, а уже загруженные строки отбросятся
+        with open(state_path, 'w') as state:
+            json.dump({'offset': offset}, state)
+        return len(batches[0][1])
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import stats
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счетчики авторов с таблицами Post и Follow.'
+
+    def handle(self, *args, **options):
+        repaired = stats.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено записей: {repaired}.'))
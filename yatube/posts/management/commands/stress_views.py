@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from collections import Counter
+from itertools import cycle
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+from django.test import Client
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, User
+
+from .benchmark_views import percentile
+
+# Поведение SQLite по умолчанию для сравнения: журнал отката, fsync
+# на каждый коммит и отложенные транзакции. Режим WAL хранится в файле
+# базы, поэтому его нужно выключать явно
+BASELINE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+}
+
+
+class ThreadClient(Client):
+    """
+    Тестовый клиент для работы в своем потоке. Сигнал
+    got_request_exception получают все клиенты с запросом в обработке,
+    поэтому чужие исключения отбрасываются.
+    """
+
+    def request(self, **request):
+        self.thread = threading.get_ident()
+        return super().request(**request)
+
+    def store_exc_info(self, **kwargs):
+        if threading.get_ident() == self.thread:
+            super().store_exc_info(**kwargs)
+
+
+class Command(BaseCommand):
+    help = ('Нагружает страницы параллельными читателями и писателями '
+            '(комментарии и посты) и выводит пропускную способность '
+            'и ошибки вроде database is locked.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=8,
+            help='Потоков, читающих ленту, профиль и пост.')
+        parser.add_argument(
+            '--writers', type=int, default=4,
+            help='Потоков, пишущих комментарии и посты.')
+        parser.add_argument(
+            '--seconds', type=float, default=10,
+            help='Длительность нагрузки.')
+        parser.add_argument(
+            '--baseline', action='store_true',
+            help='Прогон с настройками SQLite по умолчанию для сравнения.')
+        parser.add_argument(
+            '--output', default=None,
+            help='Файл для результатов в формате JSON.')
+        parser.add_argument(
+            '--label', default='',
+            help='Метка прогона, например хэш коммита.')
+
+    def fixtures(self, writers):
+        author, _ = User.objects.get_or_create(username='stress_author')
+        post = author.posts.order_by('pk').first() or Post.objects.create(
+            text='Пост для нагрузки', author=author)
+        users = [
+            User.objects.get_or_create(username=f'stress_writer{number}')[0]
+            for number in range(writers)]
+        return author, post, users
+
+    def run_worker(self, kind, requests, deadline, results):
+        """Повторяет запросы до срока; соединение потока закрывается."""
+        try:
+            for request in cycle(requests):
+                if time.perf_counter() >= deadline:
+                    break
+                start = time.perf_counter()
+                try:
+                    status = request().status_code
+                    error = None if status < 400 else f'HTTP {status}'
+                except DatabaseError as database_error:
+                    error = str(database_error)
+                results.append((kind, time.perf_counter() - start, error))
+        finally:
+            connections.close_all()
+
+    def summary(self, results, kind, seconds):
+        rows = [row for row in results if row[0] == kind]
+        timings = [duration * 1000 for _, duration, error in rows
+                   if error is None]
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if row[2] is not None),
+            'per_second': round(len(timings) / seconds, 1),
+            'p50_ms': round(percentile(timings, 0.5), 3) if timings else None,
+            'p95_ms': round(percentile(timings, 0.95), 3) if timings else None,
+        }
+
+    def stress(self, readers, writers, seconds):
+        author, post, users = self.fixtures(writers)
+        post_url = reverse('post', kwargs={
+            'username': author.username, 'post_id': post.pk})
+        comment_url = reverse('add_comment', kwargs={
+            'username': author.username, 'post_id': post.pk})
+        workers = []
+        for _ in range(readers):
+            client = ThreadClient()
+            workers.append(('read', [
+                lambda client=client: client.get(reverse('index')),
+                lambda client=client: client.get(post_url),
+                lambda client=client: client.get(
+                    reverse('profile', args=[author.username])),
+            ]))
+        for user in users:
+            client = ThreadClient()
+            client.force_login(user)
+            workers.append(('write', [
+                lambda client=client: client.post(
+                    comment_url, {'text': 'Комментарий под нагрузкой'}),
+                lambda client=client: client.post(
+                    reverse('new_post'), {'text': 'Пост под нагрузкой'}),
+            ]))
+        results = []
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=self.run_worker,
+                             args=(kind, requests, deadline, results))
+            for kind, requests in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def handle(self, *args, readers, writers, seconds, baseline, output,
+               label, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Нагрузка рассчитана на SQLite')
+        pragmas = (override_settings(SQLITE_PRAGMAS=BASELINE_PRAGMAS,
+                                     SQLITE_TRANSACTION_MODE=None)
+                   if baseline else override_settings())
+        # Тестовое окружение добавляет testserver в ALLOWED_HOSTS;
+        # при запуске из тестов оно уже настроено
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            own_environment = False
+        try:
+            with pragmas:
+                # Новое соединение получит прагмы прогона до старта потоков
+                connection.close()
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    journal_mode = cursor.fetchone()[0]
+                    cursor.execute('PRAGMA synchronous')
+                    synchronous = cursor.fetchone()[0]
+                results = self.stress(readers, writers, seconds)
+                connection.close()
+        finally:
+            if own_environment:
+                teardown_test_environment()
+        report = {
+            'label': label,
+            'created': timezone.now().isoformat(),
+            'journal_mode': journal_mode,
+            'synchronous': synchronous,
+            'readers': readers,
+            'writers': writers,
+            'seconds': seconds,
+            'reads': self.summary(results, 'read', seconds),
+            'writes': self.summary(results, 'write', seconds),
+            'errors': dict(Counter(
+                error for _, _, error in results if error).most_common(5)),
+        }
+        self.stdout.write(f'journal_mode={journal_mode} '
+                          f'synchronous={synchronous}')
+        self.stdout.write(f'{"":<8}{"запросов":>10}{"ошибок":>8}'
+                          f'{"в секунду":>11}{"p95, мс":>10}')
+        for kind in ('reads', 'writes'):
+            result = report[kind]
+            p95 = result['p95_ms'] if result['p95_ms'] is not None else 0
+            self.stdout.write(
+                f'{kind:<8}{result["requests"]:>10}{result["errors"]:>8}'
+                f'{result["per_second"]:>11.1f}{p95:>10.2f}')
+        for error, count in report['errors'].items():
+            self.stdout.write(f'{count} × {error}')
+        if output:
+            with open(output, 'w', encoding='utf-8') as file_:
+                json.dump(report, file_, ensure_ascii=False, indent=2)
@@ -0,0 +1,26 @@
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик из DB_REPLICAS, '
+            'чтобы проверить чтение с реплик локально.')
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: задайте DB_REPLICAS')
+        source.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            target = connections[alias]
+            target.close()
+            with closing(sqlite3.connect(
+                    target.settings_dict['NAME'])) as replica:
+                source.connection.backup(replica)
+            self.stdout.write(f'{alias}: {target.settings_dict["NAME"]}')
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+
+    def counts(model, field):
+        return dict(model.objects.filter(**{f'{field}__isnull': False})
+                    .order_by().values_list(field)
+                    .annotate(total=models.Count('pk')))
+
+    followers = counts(Follow, 'author')
+    following = counts(Follow, 'user')
+    posts = counts(Post, 'author')
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(user_id=pk,
+                     followers_count=followers.get(pk, 0),
+                     following_count=following.get(pk, 0),
+                     posts_count=posts.get(pk, 0))
+         for pk in User.objects.values_list('pk', flat=True).iterator()),
+        batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0018_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписан')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+            ],
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
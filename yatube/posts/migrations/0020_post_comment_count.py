@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:33
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    Post = apps.get_model('posts', 'Post')
+    comments = Comment.objects.filter(
+        post=models.OuterRef('pk')
+    ).order_by().values('post').annotate(
+        total=models.Count('pk')
+    ).values('total')
+    Post.objects.update(comment_count=Coalesce(
+        models.Subquery(comments, output_field=models.IntegerField()), 0))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def install_search(apps, schema_editor):
+    from posts.search import get_backend
+    get_backend(schema_editor.connection).install()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.TextField(blank=True, default='', editable=False, help_text='JSON: формат, ширина, высота и файл каждого варианта', verbose_name='Варианты изображения'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 2.2.28 on 2026-10-17 18:01
+
+from django.db import migrations, models
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    duplicates = (Follow.objects.order_by().values('user', 'author')
+                  .annotate(keep=models.Min('pk'), total=models.Count('pk'))
+                  .filter(total__gt=1))
+    affected = set()
+    for row in duplicates.iterator():
+        Follow.objects.filter(user=row['user'], author=row['author']).exclude(
+            pk=row['keep']).delete()
+        affected.update((row['user'], row['author']))
+    # Счетчики подписок учитывали дубли: пересчитываем затронутых
+    for user_id in affected - {None}:
+        AuthorStats.objects.filter(user_id=user_id).update(
+            followers_count=Follow.objects.filter(author_id=user_id).count(),
+            following_count=Follow.objects.filter(user_id=user_id).count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created'], name='comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['author', 'user'], name='follow_author_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='post_group_pub_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-17 18:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, verbose_name='Выгрузка')),
+                ('source_pk', models.PositiveIntegerField(verbose_name='id в выгрузке')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='importedpost',
+            constraint=models.UniqueConstraint(fields=('source', 'source_pk'), name='unique_imported_post'),
+        ),
+    ]
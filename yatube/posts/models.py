@@ -1,3 +1,5 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from pytils.translit import slugify
@@ -19,6 +21,12 @@ class Group(models.Model):
         super().save(*args, **kwargs)
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты с автором и группой, загруженными одним запросом."""
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -43,13 +51,37 @@ class Post(models.Model):
         blank=True,
         null=True,
         verbose_name='Изображение')
+    comment_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False)
+    image_variants = models.TextField(
+        'Варианты изображения',
+        blank=True,
+        default='',
+        editable=False,
+        help_text='JSON: формат, ширина, высота и файл каждого варианта')
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        # Ленты автора и группы: фильтр по автору или группе и курсор
+        # (-pub_date, -id) читаются из одного индекса без сортировки
+        indexes = [
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def image_sources(self):
+        return json.loads(self.image_variants) if self.image_variants else []
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -68,6 +100,12 @@ class Comment(models.Model):
         help_text='Напиши комментарий')
     created = models.DateTimeField('date published', auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created'],
+                         name='comment_post_created_idx'),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -87,5 +125,78 @@ class Follow(models.Model):
         verbose_name='Подписан',
         help_text='Тот, на кого подписался')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'user'],
+                         name='follow_author_user_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_follow'),
+        ]
+
     def __str__(self):
         return f'Подписка {self.user.username}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост')
+    pub_date = models.DateTimeField('date published')
+
+    class Meta:
+        ordering = ['-pub_date', '-post']
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post'],
+                         name='timeline_user_pub_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_timeline_entry'),
+        ]
+
+    def __str__(self):
+        return f'Лента {self.user_id}: пост {self.post_id}'
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор')
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписан', default=0)
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+
+    def __str__(self):
+        return f'Счетчики {self.user_id}'
+
+
+class ImportedPost(models.Model):
+    """Пост из выгрузки import_jsonl и его id в исходной базе."""
+    source = models.CharField('Выгрузка', max_length=255)
+    source_pk = models.PositiveIntegerField('id в выгрузке')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_pk'],
+                                    name='unique_imported_post'),
+        ]
+
+    def __str__(self):
+        return f'{self.source}: {self.source_pk} → {self.post_id}'
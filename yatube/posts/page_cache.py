@@ -0,0 +1,106 @@
+import base64
+import copy
+import hashlib
+import json
+import re
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from yatube import db_router
+
+from . import follow_graph
+from .forms import CommentForm
+from .freshness import page_stamps
+
+MARKER_RE = re.compile(r'<!--hole:(\w+):([\w=-]*)-->')
+
+
+def _following(request, params):
+    return {'following': follow_graph.follows(
+        request.user, params['author_id'])}
+
+
+def _comment_form(request, params):
+    return {'form': CommentForm()}
+
+
+# Данные для дыр, которых нет в параметрах метки. Остальные дыры
+# строятся из параметров и пользователя запроса без обращений к базе
+PROVIDERS = {
+    'follow_button': _following,
+    'comment_form': _comment_form,
+}
+
+
+def is_shell(request):
+    return getattr(request, 'page_shell', False)
+
+
+def marker(name, params):
+    """Метка дыры: HTML-комментарий с именем и параметрами фрагмента."""
+    encoded = base64.urlsafe_b64encode(
+        json.dumps(params, sort_keys=True).encode()).decode()
+    return mark_safe(f'<!--hole:{name}:{encoded}-->')
+
+
+def render_hole(request, name, params):
+    provider = PROVIDERS.get(name)
+    extra = provider(request, params) if provider else {}
+    return render_to_string(
+        f'holes/{name}.html', {**params, **extra}, request=request)
+
+
+def fill(shell, request):
+    """Подставляет в оболочку страницы фрагменты для пользователя запроса."""
+    def substitute(match):
+        params = json.loads(base64.urlsafe_b64decode(match.group(2)))
+        return render_hole(request, match.group(1), params)
+    return MARKER_RE.sub(substitute, shell)
+
+
+def _key(name, stamps, request):
+    # Схема и хост входят в ключ: RSS и Atom содержат абсолютные ссылки
+    digest = hashlib.md5(':'.join(
+        [*(f'{stamp:.6f}' for stamp in stamps),
+         request.build_absolute_uri()]
+    ).encode()).hexdigest()
+    return f'page_shell:{name}:{digest}'
+
+
+def serve(view, name, scopes_func, request, *args, **kwargs):
+    """
+    Отдает страницу из закэшированной оболочки. Оболочка — ответ view,
+    выполненного от имени гостя, где персональные фрагменты шаблонов
+    заменены метками; она одна на всех и живет, пока не сменятся версии
+    областей страницы. Метки заполняются для пользователя запроса.
+    """
+    if (not getattr(settings, 'PAGE_SHELL_CACHE', False)
+            or request.method != 'GET'):
+        return view(request, *args, **kwargs)
+    stamps = page_stamps(request, scopes_func, kwargs)
+    if stamps is None:
+        return view(request, *args, **kwargs)
+    key = _key(name, stamps, request)
+    shell = cache.get(key)
+    if shell is None:
+        shell_request = copy.copy(request)
+        shell_request.user = AnonymousUser()
+        shell_request.page_shell = True
+        # Оболочка ляжет в кэш под текущими версиями: с отстающей
+        # реплики в ней закрепились бы старые данные
+        with db_router.primary():
+            response = view(shell_request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming:
+            return response
+        shell = (response.content.decode(response.charset),
+                 response['Content-Type'])
+        cache.set(key, shell, getattr(
+            settings, 'PAGE_SHELL_CACHE_TIMEOUT',
+            getattr(settings, 'FEED_CACHE_TIMEOUT', 3600)))
+    content, content_type = shell
+    return HttpResponse(fill(content, request), content_type=content_type)
@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Возвращает список значений ключа из токена или None,
+    если токен поврежден.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+class CursorPaginator(Paginator):
+    """
+    Постраничный вывод по ключу (keyset) вместо OFFSET/COUNT.
+
+    Страница выбирается условием «строго после/до ключа» по
+    упорядоченным полям, поэтому стоимость запроса не зависит от глубины.
+    Номер страницы и их число условны: 1 — первая страница, и страниц
+    ровно на одну больше, если есть следующая.
+    """
+
+    def __init__(self, object_list, per_page, keys=('-pub_date', '-id')):
+        super().__init__(object_list, per_page)
+        self.keys = keys
+        self.next_cursor = None
+        self.previous_cursor = None
+        self._num_pages = 1
+
+    def _check_object_list_is_ordered(self):
+        # Порядок задают ключи курсора, а не object_list
+        pass
+
+    @property
+    def num_pages(self):
+        return self._num_pages
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    def get_page(self, after=None, before=None):
+        after_values = self._decode(after)
+        before_values = self._decode(before) if after_values is None else None
+        if after_values is not None:
+            rows = self._fetch(after_values, forward=True)
+            has_previous, has_next = True, len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        elif before_values is not None:
+            rows = self._fetch(before_values, forward=False)
+            has_previous, has_next = len(rows) > self.per_page, True
+            rows = rows[:self.per_page][::-1]
+        else:
+            rows = self._fetch(None, forward=True)
+            has_previous, has_next = False, len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        if rows and has_next:
+            self.next_cursor = self.cursor_for(rows[-1])
+        if rows and has_previous:
+            self.previous_cursor = self.cursor_for(rows[0])
+        number = 2 if has_previous and self.previous_cursor else 1
+        self._num_pages = number + int(bool(self.next_cursor))
+        return self._get_page(rows, number, self)
+
+    def cursor_for(self, row):
+        """Курсор строки: объекта модели или словаря из values()."""
+        if isinstance(row, dict):
+            return encode_cursor([row[name.lstrip('-')]
+                                  for name in self.keys])
+        return encode_cursor([getattr(row, name.lstrip('-'))
+                              for name in self.keys])
+
+    def window(self, after=None):
+        """
+        Ленивый queryset страницы после курсора на одну строку длиннее
+        страницы: лишняя строка означает, что есть следующая.
+        """
+        return self._window(self._decode(after), forward=True)
+
+    def _window(self, values, forward):
+        ordering = self.keys if forward else [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.keys]
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, ordering))
+        return queryset.order_by(*ordering)[:self.per_page + 1]
+
+    def _fetch(self, values, forward):
+        return list(self._window(values, forward))
+
+    def _seek(self, values, ordering):
+        """
+        Строит условие (k1, k2, ...) > (v1, v2, ...) с учетом направления
+        сортировки каждого поля.
+        """
+        conditions = []
+        for position, name in enumerate(ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = {
+                ordering[i].lstrip('-'): values[i] for i in range(position)}
+            conditions.append(
+                Q(**equal, **{f'{field}__{lookup}': values[position]}))
+        return reduce(lambda left, right: left | right, conditions)
+
+    def _decode(self, token):
+        values = decode_cursor(token)
+        if values is None or len(values) != len(self.keys):
+            return None
+        model = self.object_list.model
+        try:
+            return [
+                model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.keys, values)]
+        except (FieldDoesNotExist, ValidationError):
+            return None
@@ -0,0 +1,32 @@
+from django.conf import settings
+
+
+def begin(execute, sql, params, many, context):
+    # Django открывает atomic() отложенным BEGIN; в режиме WAL запись
+    # в такой транзакции может сразу упасть с database is locked,
+    # не дожидаясь busy_timeout. BEGIN IMMEDIATE берет блокировку
+    # записи сразу и ждет ее
+    if sql == 'BEGIN':
+        mode = getattr(settings, 'SQLITE_TRANSACTION_MODE', None)
+        if mode:
+            sql = f'BEGIN {mode}'
+    return execute(sql, params, many, context)
+
+
+def apply(sender, connection, **kwargs):
+    """
+    Настраивает каждое новое соединение SQLite прагмами из SQLITE_PRAGMAS
+    и режимом транзакций SQLITE_TRANSACTION_MODE. Прагмы выполняются
+    напрямую через драйвер, мимо обработчиков запросов Django, в порядке
+    словаря: busy_timeout идет первым, чтобы смена журнала подождала
+    чужую блокировку, а не упала.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+    # Список оберток живет на DatabaseWrapper и переживает
+    # переподключения: обертку добавляем один раз
+    if (getattr(settings, 'SQLITE_TRANSACTION_MODE', None)
+            and begin not in connection.execute_wrappers):
+        connection.execute_wrappers.insert(0, begin)
@@ -0,0 +1,155 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .paginator import CursorPaginator, decode_cursor
+
+DEFAULT_BACKENDS = {
+    'sqlite': 'posts.search.SQLiteFTSBackend',
+}
+
+
+class SearchBackend:
+    """
+    Базовый поиск по тексту постов.
+
+    search() возвращает пары (id поста, ранг), упорядоченные по
+    (rank, id): меньший ранг — более релевантный пост. Параметр seek
+    задает ключ, строго после (forward) или до которого идет выборка.
+    Бэкенды других СУБД подключаются через settings.POST_SEARCH_BACKENDS.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        """Создает служебные таблицы и триггеры, если они нужны."""
+
+    def filter(self, queryset, query):
+        return queryset.filter(text__icontains=query)
+
+    def search(self, query, seek=None, forward=True, limit=10):
+        from .models import Post
+        posts = self.filter(Post.objects.all(), query)
+        if seek is not None:
+            lookup = 'lt' if forward else 'gt'
+            posts = posts.filter(**{f'id__{lookup}': seek[1]})
+        ordering = '-id' if forward else 'id'
+        ids = posts.order_by(ordering).values_list('id', flat=True)
+        return [(post_id, -post_id) for post_id in ids[:limit]]
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Поиск через виртуальную таблицу FTS5 с ранжированием bm25."""
+
+    table = 'posts_post_fts'
+    install_sql = (
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            text, content='posts_post', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_ai
+            AFTER INSERT ON posts_post BEGIN
+            INSERT INTO {table}(rowid, text) VALUES (new.id, new.text);
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_ad
+            AFTER DELETE ON posts_post BEGIN
+            INSERT INTO {table}({table}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_au
+            AFTER UPDATE OF text ON posts_post BEGIN
+            INSERT INTO {table}({table}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO {table}(rowid, text) VALUES (new.id, new.text);
+            END""",
+    )
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            tables = self.connection.introspection.table_names(cursor)
+            if 'posts_post' not in tables:
+                return
+            exists = self.table in tables
+            for statement in self.install_sql:
+                cursor.execute(statement)
+            if not exists:
+                cursor.execute(
+                    f"INSERT INTO {self.table}({self.table}) "
+                    f"VALUES ('rebuild')")
+
+    @staticmethod
+    def match_expression(query):
+        """Экранирует слова запроса, чтобы пользователь не писал на FTS5."""
+        terms = re.findall(r'\w+', query)
+        return ' '.join('"{}"'.format(term) for term in terms)
+
+    def filter(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [match]))
+
+    def search(self, query, seek=None, forward=True, limit=10):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        sql = (f'SELECT rowid, rank FROM ('
+               f'SELECT rowid, bm25({self.table}) AS rank FROM {self.table} '
+               f'WHERE {self.table} MATCH %s)')
+        params = [match]
+        if seek is not None:
+            sql += ' WHERE (rank, rowid) {} (%s, %s)'.format(
+                '>' if forward else '<')
+            params.extend(seek)
+        direction = 'ASC' if forward else 'DESC'
+        sql += f' ORDER BY rank {direction}, rowid {direction} LIMIT %s'
+        params.append(limit)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+def get_backend(using=None):
+    db = using or connection
+    backends = {
+        **DEFAULT_BACKENDS,
+        **getattr(settings, 'POST_SEARCH_BACKENDS', {}),
+    }
+    path = backends.get(db.vendor)
+    backend_class = import_string(path) if path else SearchBackend
+    return backend_class(db)
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсорный вывод результатов поиска по ключу (rank, id)."""
+
+    def __init__(self, object_list, per_page, query, backend=None):
+        super().__init__(object_list, per_page, keys=('rank', 'id'))
+        self.query = query
+        self.backend = backend or get_backend()
+
+    def _fetch(self, values, forward):
+        found = self.backend.search(
+            self.query, seek=values, forward=forward,
+            limit=self.per_page + 1)
+        posts = self.object_list.in_bulk([post_id for post_id, _ in found])
+        rows = []
+        for post_id, rank in found:
+            post = posts.get(post_id)
+            if post is not None:
+                post.rank = rank
+                rows.append(post)
+        return rows
+
+    def _decode(self, token):
+        values = decode_cursor(token)
+        if (values is None or len(values) != 2
+                or not all(isinstance(value, (int, float))
+                           for value in values)):
+            return None
+        return values
@@ -0,0 +1,93 @@
+import json
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import feed_cache, stats, thumbnails, timeline
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        previous = Post.objects.filter(pk=instance.pk).values(
+            'group_id', 'image', 'image_variants').first() or {}
+        instance._previous_group_id = previous.get('group_id')
+        instance._previous_image = previous.get('image')
+        instance._previous_variants = previous.get('image_variants')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.bump(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+    feed_cache.bump(*feed_cache.post_scopes(
+        instance, getattr(instance, '_previous_group_id', None)))
+    previous_image = getattr(instance, '_previous_image', None)
+    if previous_image and previous_image != instance.image.name:
+        thumbnails.discard(
+            json.loads(instance._previous_variants or '[]'), previous_image)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    stats.bump(instance.author_id, posts_count=-1)
+    feed_cache.bump(*feed_cache.post_scopes(instance))
+    if instance.image:
+        thumbnails.discard(instance.image_sources, instance.image.name)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance.post_id:
+        return
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+    feed_cache.bump(*feed_cache.post_scopes(instance.post))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if not instance.post_id:
+        return
+    # Комментарии из loaddata не увеличивали счетчик
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1)
+    post = Post.objects.filter(pk=instance.post_id).first()
+    if post is not None:
+        feed_cache.bump(*feed_cache.post_scopes(post))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    feed_cache.bump('groups')
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.user_id and instance.author_id:
+        stats.bump(instance.author_id, followers_count=1)
+        stats.bump(instance.user_id, following_count=1)
+        feed_cache.bump(*feed_cache.stats_scopes(instance))
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    if instance.user_id and instance.author_id:
+        stats.bump(instance.author_id, followers_count=-1)
+        stats.bump(instance.user_id, following_count=-1)
+        feed_cache.bump(*feed_cache.stats_scopes(instance))
+        timeline.trim(instance.user_id, instance.author_id)
@@ -0,0 +1,56 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Follow, Post, User
+
+
+def _count(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by()
+    return Coalesce(
+        Subquery(rows.values(field).annotate(total=Count('pk')).values(
+            'total'), output_field=IntegerField()),
+        0)
+
+
+def bump(user_id, **deltas):
+    """
+    Сдвигает счетчики автора на заданные величины одним UPDATE.
+    Отсутствующая запись не создается: ее восстановит reconcile().
+    Уменьшение останавливается на нуле: строки, загруженные без
+    сигналов (loaddata), не учтены в счетчиках.
+    """
+    changes = {
+        field: Greatest(F(field) + delta, 0) if delta < 0
+        else F(field) + delta
+        for field, delta in deltas.items()}
+    AuthorStats.objects.filter(user_id=user_id).update(**changes)
+
+
+def reconcile(user_ids=None):
+    """
+    Пересчитывает счетчики по таблицам Post и Follow и исправляет
+    расхождения. Возвращает число исправленных записей.
+    """
+    users = User.objects.annotate(
+        actual_followers=_count(Follow, 'author'),
+        actual_following=_count(Follow, 'user'),
+        actual_posts=_count(Post, 'author'),
+    ).select_related('stats').order_by('pk')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    repaired = 0
+    for user in users.iterator():
+        actual = {
+            'followers_count': user.actual_followers,
+            'following_count': user.actual_following,
+            'posts_count': user.actual_posts,
+        }
+        stats = getattr(user, 'stats', None)
+        if stats is None:
+            AuthorStats.objects.get_or_create(user=user, defaults=actual)
+            repaired += 1
+        elif any(getattr(stats, field) != value
+                 for field, value in actual.items()):
+            AuthorStats.objects.filter(user=user).update(**actual)
+            repaired += 1
+    return repaired
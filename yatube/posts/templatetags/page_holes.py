@@ -0,0 +1,19 @@
+from django import template
+
+from posts import page_cache
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **params):
+    """
+    Персональный фрагмент страницы из шаблона holes/<name>.html.
+    При обычном рендере выводится сразу, как include с параметрами;
+    в оболочке страницы вместо него ставится метка для page_cache.fill.
+    """
+    if page_cache.is_shell(context.get('request')):
+        return page_cache.marker(name, params)
+    fragment = context.template.engine.get_template(f'holes/{name}.html')
+    with context.push(**params):
+        return fragment.render(context)
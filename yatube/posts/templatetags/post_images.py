@@ -0,0 +1,38 @@
+from django import template
+from django.core.files.storage import default_storage
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+def _srcset(variants):
+    return ', '.join(
+        f'{default_storage.url(item["name"])} {item["width"]}w'
+        for item in variants)
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post):
+    """
+    Адаптивная картинка поста из готовых вариантов. Пока их нет,
+    ставит построение в очередь и выводит оригинал.
+    """
+    if not post.image:
+        return {}
+    variants = post.image_sources
+    if not variants:
+        thumbnails.schedule(post.image.name)
+        return {'original': post.image.url}
+    by_format = {}
+    for item in variants:
+        by_format.setdefault(item['format'], []).append(item)
+    fallback = by_format.get('jpeg') or variants
+    largest = max(fallback, key=lambda item: item['width'])
+    return {
+        'webp_srcset': _srcset(by_format.get('webp', [])),
+        'jpeg_srcset': _srcset(fallback),
+        'src': default_storage.url(largest['name']),
+        'width': largest['width'],
+        'height': largest['height'],
+    }
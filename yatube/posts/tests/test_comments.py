@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import views
+from posts.models import Comment, Post, User
+
+
+class CommentPagesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Текст поста', author=cls.author)
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'Комментарий {number}')
+            for number in range(views.comments_on_page + 5)]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post_url = reverse('post', kwargs={
+            'username': 'author', 'post_id': CommentPagesTest.post.pk})
+        self.comments_url = reverse('post_comments', kwargs={
+            'username': 'author', 'post_id': CommentPagesTest.post.pk})
+
+    def next_cursor(self):
+        response = self.guest_client.get(self.comments_url)
+        return response.context['comments'].paginator.next_cursor
+
+    def test_first_page_inline(self):
+        """На странице поста только первая страница комментариев."""
+        response = self.guest_client.get(self.post_url)
+        comments = list(response.context['comments'])
+        self.assertEqual(comments,
+                         CommentPagesTest.comments[:views.comments_on_page])
+        self.assertContains(response, 'Показать еще')
+        self.assertNotContains(
+            response, f'Комментарий {views.comments_on_page}<')
+
+    def test_fragment(self):
+        """Фрагмент следующей страницы без оболочки сайта."""
+        response = self.guest_client.get(
+            self.comments_url, {'after': self.next_cursor()})
+        self.assertTemplateUsed(response, 'includes/comment_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(list(response.context['comments']),
+                         CommentPagesTest.comments[views.comments_on_page:])
+        self.assertNotContains(response, 'Показать еще')
+
+    def test_json(self):
+        response = self.guest_client.get(
+            self.comments_url, {'after': self.next_cursor(), 'format': 'json'})
+        data = response.json()
+        self.assertIsNone(data['next'])
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']],
+            [comment.text for comment
+             in CommentPagesTest.comments[views.comments_on_page:]])
+        self.assertEqual(data['comments'][0]['author'], 'author')
+
+    def test_missing_post(self):
+        url = reverse('post_comments',
+                      kwargs={'username': 'author', 'post_id': 0})
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+class DatasetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_dataset', '--users', '30', '--groups', '3',
+            '--posts', '200', '--follows', '5', '--comments', '100',
+            '--seed', '1', stdout=StringIO())
+
+    def test_generate_dataset(self):
+        """Генератор создает связанные данные и производные счетчики."""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertTrue(Follow.objects.exists())
+        self.assertEqual(
+            sum(Post.objects.values_list('comment_count', flat=True)), 100)
+        self.assertEqual(AuthorStats.objects.count(), 30)
+        posts_count = sorted(AuthorStats.objects.values_list(
+            'posts_count', flat=True), reverse=True)
+        self.assertGreater(posts_count[0], 5 * posts_count[len(posts_count)
+                                                           // 2])
+
+    def test_benchmark_views(self):
+        """Бенчмарк сохраняет задержки и число запросов по страницам."""
+        output = os.path.join(tempfile.mkdtemp(), 'bench.json')
+        self.addCleanup(os.remove, output)
+        call_command('benchmark_views', '--requests', '3', '--cold',
+                     '--output', output, stdout=StringIO())
+        with open(output, encoding='utf-8') as file_:
+            report = json.load(file_)
+        self.assertEqual(
+            set(report['views']),
+            {'index', 'group_posts', 'profile', 'post', 'follow_index'})
+        for result in report['views'].values():
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['queries_max'], 0)
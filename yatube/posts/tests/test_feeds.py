@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+@override_settings(PAGE_SHELL_CACHE=True)
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-group', description='Описание группы')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.post = Post.objects.create(
+            text='Пост в группе', author=cls.author, group=cls.group)
+        Post.objects.create(text='Пост без группы', author=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds(self):
+        """Ленты содержат только свои записи в нужном формате."""
+        cases = [
+            ('index_rss', {}, 'application/rss+xml',
+             ['Пост в группе', 'Пост без группы'], []),
+            ('index_atom', {}, 'application/atom+xml',
+             ['Пост в группе', 'Пост без группы'], []),
+            ('group_rss', {'slug': 'test-group'}, 'application/rss+xml',
+             ['Пост в группе', 'Описание группы'], ['Пост без группы']),
+            ('group_atom', {'slug': 'test-group'}, 'application/atom+xml',
+             ['Пост в группе'], ['Пост без группы']),
+            ('profile_rss', {'username': 'other'}, 'application/rss+xml',
+             ['Пост без группы'], ['Пост в группе']),
+            ('profile_atom', {'username': 'other'}, 'application/atom+xml',
+             ['Пост без группы'], ['Пост в группе']),
+        ]
+        for name, kwargs, content_type, present, absent in cases:
+            with self.subTest(feed=name):
+                response = self.client.get(reverse(name, kwargs=kwargs))
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type))
+                for text in present:
+                    self.assertContains(response, text)
+                for text in absent:
+                    self.assertNotContains(response, text)
+
+    def test_cached_and_conditional(self):
+        """Повторный опрос — из кэша, свежая копия — 304 для любого."""
+        url = reverse('group_rss', kwargs={'slug': 'test-group'})
+        first = self.client.get(url)
+        self.assertIn('public', first['Cache-Control'])
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+
+        reader = Client()
+        reader.force_login(SyndicationFeedTest.other)
+        with self.assertNumQueries(1):
+            response = reader.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalidated_on_post_save(self):
+        url = reverse('profile_atom', kwargs={'username': 'author'})
+        etag = self.client.get(url)['ETag']
+        SyndicationFeedTest.post.text = 'Исправленный пост'
+        SyndicationFeedTest.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Исправленный пост')
+
+    @override_settings(ALLOWED_HOSTS=['one.example', 'two.example'])
+    def test_links_follow_request_host(self):
+        """Закэшированная лента не отдает ссылки чужого хоста и схемы."""
+        url = reverse('index_rss')
+        self.client.get(url, HTTP_HOST='one.example')
+        response = self.client.get(url, HTTP_HOST='two.example')
+        self.assertContains(response, 'http://two.example/')
+        self.assertNotContains(response, 'one.example')
+        response = self.client.get(url, HTTP_HOST='two.example', secure=True)
+        self.assertContains(response, 'https://two.example/')
+        self.assertNotContains(response, 'http://two.example/')
+
+    def test_missing_objects(self):
+        for url in (reverse('group_rss', kwargs={'slug': 'missing'}),
+                    reverse('profile_atom', kwargs={'username': 'missing'})):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_pages_link_feeds(self):
+        response = self.client.get(
+            reverse('group', kwargs={'slug': 'test-group'}))
+        self.assertContains(
+            response, reverse('group_rss', kwargs={'slug': 'test-group'}))
@@ -0,0 +1,71 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import follow_graph
+from posts.models import Follow, User
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)]
+        Follow.objects.create(user=cls.reader, author=cls.authors[0])
+        Follow.objects.create(user=cls.reader, author=cls.authors[2])
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh_reader(self):
+        # Свежий объект, как request.user нового запроса
+        return User.objects.get(pk=FollowGraphTest.reader.pk)
+
+    def test_many_authors_in_one_query(self):
+        """Состояние подписки на многих авторов — один запрос."""
+        reader = self.fresh_reader()
+        authors = FollowGraphTest.authors
+        with self.assertNumQueries(1):
+            state = follow_graph.is_following(reader, authors)
+            follow_graph.follows(reader, authors[1])
+        self.assertEqual(state, {authors[0].pk: True,
+                                 authors[1].pk: False,
+                                 authors[2].pk: True})
+
+    def test_shared_cache(self):
+        """Следующий запрос берет подписки из кэша."""
+        follow_graph.followees(self.fresh_reader())
+        reader = self.fresh_reader()
+        with self.assertNumQueries(0):
+            self.assertTrue(follow_graph.follows(
+                reader, FollowGraphTest.authors[0].pk))
+
+    def test_invalidated_by_follow_and_unfollow(self):
+        follow_graph.followees(self.fresh_reader())
+        author = FollowGraphTest.authors[1]
+        follow = Follow.objects.create(
+            user=FollowGraphTest.reader, author=author)
+        self.assertTrue(follow_graph.follows(self.fresh_reader(), author))
+        follow.delete()
+        self.assertFalse(follow_graph.follows(self.fresh_reader(), author))
+
+    def test_anonymous(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                follow_graph.is_following(
+                    AnonymousUser(), FollowGraphTest.authors[:1]),
+                {FollowGraphTest.authors[0].pk: False})
+
+    def test_profile_button(self):
+        """Кнопка на странице профиля следует за подпиской."""
+        client = Client()
+        client.force_login(FollowGraphTest.reader)
+        author = FollowGraphTest.authors[1]
+        url = reverse('profile', kwargs={'username': author.username})
+        self.assertContains(client.get(url), 'Подписаться')
+        client.get(reverse('profile_follow',
+                           kwargs={'username': author.username}))
+        self.assertContains(client.get(url), 'Отписаться')
@@ -1,15 +1,26 @@
+import os
 import shutil
 import tempfile
+import tracemalloc
+from io import BytesIO
+from unittest import mock
 
 from django.conf import settings
-from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.core.files.uploadedfile import (SimpleUploadedFile,
+                                            TemporaryUploadedFile)
+from django.template.defaultfilters import filesizeformat
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
 
+from posts import views
 from posts.forms import PostForm
 from posts.models import Post, User
+from posts.uploads import LimitedTemporaryFileUploadHandler
 
 
+@override_settings(THUMBNAIL_BACKGROUND=False)
 class PostCreateFormTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -150,3 +161,122 @@ class PostCreateFormTests(TestCase):
 #         print(test_post.comment.all())
 #         print(new_comment)
 #         print(Comment.objects.count())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(),
+                   THUMBNAIL_BACKGROUND=False,
+                   POST_IMAGE_MAX_PIXELS=10_000,
+                   POST_IMAGE_REJECT_PIXELS=1_000_000)
+class ImageUploadLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Dima')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ImageUploadLimitTests.user)
+
+    def upload(self, size, image_format='JPEG', name='image.jpg'):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, image_format)
+        buffer.name = name
+        buffer.seek(0)
+        return self.authorized_client.post(
+            reverse('new_post'),
+            data={'text': 'Пост с картинкой', 'image': buffer})
+
+    def test_large_jpeg_downscaled(self):
+        """JPEG больше лимита пикселей уменьшается до лимита."""
+        response = self.upload((400, 300))
+        self.assertRedirects(response, reverse('index'))
+        post = Post.objects.get(text='Пост с картинкой')
+        with Image.open(post.image.path) as image:
+            width, height = image.size
+        self.assertLessEqual(width * height, 10_000)
+        self.assertEqual(round(width / height, 1), round(400 / 300, 1))
+
+    def test_large_png_rejected(self):
+        """PNG больше лимита пикселей отклоняется."""
+        response = self.upload((400, 300), 'PNG', 'image.png')
+        self.assertFormError(response, 'form', 'image',
+                             'Слишком большое изображение: 400×300.')
+        self.assertFalse(Post.objects.exists())
+
+    def test_huge_image_rejected(self):
+        """Картинка больше жесткого лимита отклоняется без уменьшения."""
+        response = self.upload((1100, 1000))
+        self.assertFormError(response, 'form', 'image',
+                             'Слишком большое изображение: 1100×1000.')
+
+    @override_settings(POST_IMAGE_MAX_BYTES=256)
+    def test_oversized_file_rejected(self):
+        """Файл больше лимита байтов отклоняется и не пишется целиком."""
+        response = self.upload((90, 90))
+        self.assertFormError(response, 'form', 'image',
+                             f'Файл больше {filesizeformat(256)}.')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_BYTES=10)
+    def test_handler_streams_to_disk(self):
+        """Обработчик загрузки пишет на диск не больше лимита."""
+        handler = LimitedTemporaryFileUploadHandler()
+        handler.new_file('image', 'image.jpg', 'image/jpeg', 30)
+        for start in range(0, 30, 6):
+            handler.receive_data_chunk(b'x' * 6, start)
+        upload = handler.file_complete(30)
+        self.assertIsInstance(upload, TemporaryUploadedFile)
+        self.assertTrue(upload.oversized)
+        self.assertLessEqual(os.path.getsize(upload.temporary_file_path()),
+                             10)
+
+    def test_csrf_still_checked(self):
+        """Перенос проверки CSRF внутрь view не отключает ее."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(ImageUploadLimitTests.user)
+        response = client.post(reverse('new_post'), data={'text': 'Пост'})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.exists())
+
+    def test_peak_memory_bounded(self):
+        """Загрузка не собирается в памяти, JPEG декодируется уменьшенным."""
+        buffer = BytesIO()
+        Image.frombytes('RGB', (1000, 1000), os.urandom(3_000_000)).save(
+            buffer, 'JPEG', quality=95)
+        content = buffer.getvalue()
+        decoded = []
+        load = JpegImageFile.load
+
+        def spy(image):
+            decoded.append(image.size[0] * image.size[1])
+            return load(image)
+
+        def post():
+            # Тело запроса собирается заранее, вне замера
+            request = RequestFactory().post(reverse('new_post'), data={
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile('image.jpg', content)})
+            request.user = ImageUploadLimitTests.user
+            request._dont_enforce_csrf_checks = True
+            tracemalloc.start()
+            try:
+                response = views.new_post(request)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                request.close()
+            self.assertEqual(response.status_code, 302)
+            return peak
+
+        # Первый запрос прогревает импорты плагинов Pillow
+        post()
+        with mock.patch.object(JpegImageFile, 'load', spy):
+            peak = post()
+        self.assertGreater(len(content), 1024 * 1024)
+        self.assertLess(peak, len(content) / 2)
+        self.assertLessEqual(max(decoded), 4 * 10_000)
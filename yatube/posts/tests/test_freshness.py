@@ -0,0 +1,102 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            text='Текст поста', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        self.urls = {
+            'index': reverse('index'),
+            'group': reverse('group', kwargs={'slug': self.group.slug}),
+            'profile': reverse(
+                'profile', kwargs={'username': self.author.username}),
+            'post': reverse('post', kwargs={
+                'username': self.author.username, 'post_id': self.post.pk}),
+        }
+
+    def revalidate(self, client, url):
+        """Возвращает код ответа на повторный запрос с валидаторами."""
+        response = client.get(url)
+        return lambda: client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']).status_code
+
+    def test_unchanged_pages_not_modified(self):
+        """Неизменная страница отдается как 304 без тела."""
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                self.assertIn('no-cache', response['Cache-Control'])
+                repeated = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(repeated.status_code, 304)
+                self.assertEqual(repeated.content, b'')
+                repeated = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(repeated.status_code, 304)
+
+    def test_etag_differs_between_users(self):
+        """Гость и пользователь получают разные ETag."""
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                self.assertNotEqual(
+                    self.guest_client.get(url)['ETag'],
+                    self.authorized_client.get(url)['ETag'])
+
+    def test_relogin_changes_post_page(self):
+        """После нового входа копия со старым CSRF-токеном устаревает."""
+        self.reader.set_password('password')
+        self.reader.save()
+        client = Client()
+        credentials = {'username': 'reader', 'password': 'password'}
+        client.post(reverse('login'), credentials)
+        status = self.revalidate(client, self.urls['post'])
+        client.post(reverse('logout'))
+        client.post(reverse('login'), credentials)
+        self.assertEqual(status(), 200)
+
+    def test_comment_changes_post_page(self):
+        """Новый комментарий делает копию страницы поста устаревшей."""
+        status = self.revalidate(self.guest_client, self.urls['post'])
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        self.assertEqual(status(), 200)
+
+    def test_new_post_changes_feeds(self):
+        """Новый пост обновляет ленты, где он появляется."""
+        statuses = {name: self.revalidate(self.guest_client, url)
+                    for name, url in self.urls.items()}
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group)
+        for name in ('index', 'group', 'profile', 'post'):
+            with self.subTest(page=name):
+                self.assertEqual(statuses[name](), 200)
+
+    def test_follow_changes_profile(self):
+        """Подписка меняет кнопку и счетчики в профиле."""
+        status = self.revalidate(
+            self.authorized_client, self.urls['profile'])
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(status(), 200)
+
+    def test_missing_objects_still_404(self):
+        """Для несуществующих объектов валидаторы не мешают 404."""
+        response = self.guest_client.get(
+            reverse('group', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
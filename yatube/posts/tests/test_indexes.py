@@ -0,0 +1,50 @@
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, skipUnlessDBFeature
+
+from posts.models import Follow, Group, Post, User
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class HotQueryIndexTest(TestCase):
+    """Планы горячих запросов используют составные индексы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            text='Текст', author=cls.author, group=cls.group)
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_author_feed(self):
+        self.assertUsesIndex(
+            self.author.posts.order_by('-pub_date', '-id')[:10],
+            'post_author_pub_date_idx')
+
+    def test_group_feed(self):
+        self.assertUsesIndex(
+            self.group.group_posts.order_by('-pub_date', '-id')[:10],
+            'post_group_pub_date_idx')
+
+    def test_post_comments(self):
+        self.assertUsesIndex(
+            self.post.comments.order_by('created', 'id'),
+            'comment_post_created_idx')
+
+    def test_author_followers(self):
+        self.assertUsesIndex(
+            Follow.objects.filter(author=self.author).values_list('user_id'),
+            'follow_author_user_idx')
+
+    def test_follow_is_unique(self):
+        """Повторная подписка на того же автора не создается."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with transaction.atomic(), self.assertRaises(IntegrityError):
+            Follow.objects.create(user=self.reader, author=self.author)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.management.commands import import_jsonl
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+class JsonlTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        self.post = Post.objects.create(
+            text='Первый пост', author=self.author, group=self.group)
+        Post.objects.create(text='Второй пост', author=self.author)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.pub_date = Post.objects.get(pk=self.post.pk).pub_date
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'dump.jsonl')
+        self.addCleanup(lambda: [
+            os.remove(os.path.join(directory, name))
+            for name in os.listdir(directory)])
+        call_command('export_jsonl', self.path, stderr=StringIO())
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+    def load(self, *args):
+        call_command('import_jsonl', self.path, *args, stdout=StringIO())
+
+    def assertRestored(self):
+        author = User.objects.get(username='author')
+        post = Post.objects.get(text='Первый пост')
+        self.assertEqual(post.author, author)
+        self.assertEqual(post.group.slug, 'group')
+        self.assertEqual(post.pub_date, self.pub_date)
+        self.assertEqual(post.comment_count, 1)
+        self.assertEqual(author.posts.count(), 2)
+        self.assertEqual(post.comments.get().author.username, 'reader')
+        reader = User.objects.get(username='reader')
+        self.assertTrue(Follow.objects.filter(
+            user=reader, author=author).exists())
+        self.assertEqual(AuthorStats.objects.get(user=author).posts_count, 2)
+        self.assertEqual(reader.timeline.count(), 2)
+
+    def test_roundtrip(self):
+        """Выгрузка загружается обратно вместе со связями и счетчиками."""
+        self.load('--batch-size', '1')
+        self.assertRestored()
+        self.assertFalse(os.path.exists(f'{self.path}.state'))
+
+    def test_repeated_import_is_idempotent(self):
+        """Повторная загрузка не создает дублей."""
+        self.load()
+        self.load()
+        self.assertRestored()
+
+    def test_resume_after_failure(self):
+        """После сбоя загрузка продолжается с последней пачки."""
+        failing = mock.Mock(side_effect=RuntimeError)
+        with mock.patch.dict(import_jsonl.BUILDERS, comment=failing):
+            with self.assertRaises(RuntimeError):
+                self.load('--batch-size', '1')
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertTrue(os.path.exists(f'{self.path}.state'))
+        with mock.patch.object(
+                import_jsonl, 'build_users',
+                side_effect=AssertionError('пользователи уже загружены')):
+            with mock.patch.dict(import_jsonl.BUILDERS,
+                                 user=import_jsonl.build_users):
+                self.load('--resume', '--batch-size', '1')
+        self.assertRestored()
+
+    def test_import_into_non_empty_database(self):
+        """Посты и комментарии не затирают и не задевают чужие строки."""
+        other = User.objects.create_user(username='other')
+        # Занимает первичный ключ выгруженного поста
+        occupied = Post.objects.create(
+            pk=self.post.pk, text='Чужой пост', author=other)
+        Comment.objects.create(post=occupied, author=other, text='Свой')
+        self.load()
+        self.assertRestored()
+        occupied.refresh_from_db()
+        self.assertEqual(occupied.text, 'Чужой пост')
+        self.assertEqual(occupied.comment_count, 1)
+        self.assertEqual(occupied.comments.get().text, 'Свой')
+        self.assertEqual(Post.objects.count(), 3)
+
+    def test_posts_with_same_author_and_date(self):
+        """Посты с общими автором и датой загружаются оба и со своими
+        комментариями."""
+        self.load()
+        first = Post.objects.get(text='Первый пост')
+        second = Post.objects.get(text='Второй пост')
+        Post.objects.filter(pk=second.pk).update(pub_date=first.pub_date)
+        Comment.objects.create(
+            post=second, author=first.author, text='Ко второму')
+        call_command('export_jsonl', self.path, stderr=StringIO())
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.load()
+        self.assertEqual(Post.objects.count(), 2)
+        for text, comment in (('Первый пост', 'Комментарий'),
+                              ('Второй пост', 'Ко второму')):
+            with self.subTest(text=text):
+                self.assertEqual(
+                    Post.objects.get(text=text).comments.get().text, comment)
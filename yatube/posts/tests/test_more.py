@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import views
+from posts.models import Group, Post, User
+
+
+class FeedFragmentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-group', description='Описание')
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.author,
+                                group=cls.group)
+            for number in range(views.posts_on_page + 3)][::-1]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(FeedFragmentTest.author)
+        self.pages = {
+            reverse('index'): reverse('index_more'),
+            reverse('group', kwargs={'slug': 'test-group'}):
+                reverse('group_more', kwargs={'slug': 'test-group'}),
+            reverse('profile', kwargs={'username': 'author'}):
+                reverse('profile_more', kwargs={'username': 'author'}),
+        }
+
+    def test_page_points_to_fragment(self):
+        """Лента ссылается на фрагмент со следующей порцией."""
+        for page_url, more_url in self.pages.items():
+            with self.subTest(url=page_url):
+                response = self.guest_client.get(page_url)
+                cursor = response.context['page'].paginator.next_cursor
+                self.assertContains(
+                    response, f'data-url="{more_url}?after={cursor}"')
+                self.assertContains(response, 'js-more-posts')
+
+    def test_fragment_has_only_cards(self):
+        """Фрагмент — только карточки следующей порции, без страницы."""
+        for page_url, more_url in self.pages.items():
+            with self.subTest(url=more_url):
+                cursor = self.guest_client.get(
+                    page_url).context['page'].paginator.next_cursor
+                cache.clear()
+                response = self.guest_client.get(more_url, {'after': cursor})
+                self.assertTemplateUsed(response, 'includes/post_list.html')
+                self.assertTemplateNotUsed(response, 'base.html')
+                self.assertTemplateNotUsed(response, 'includes/menu.html')
+                self.assertEqual(
+                    list(response.context['page']),
+                    FeedFragmentTest.posts[views.posts_on_page:])
+                self.assertNotContains(response, 'js-more-posts')
+
+    @override_settings(PAGE_SHELL_CACHE=True)
+    def test_fragment_cached_with_personal_actions(self):
+        """Порция из общего кэша получает кнопки текущего пользователя."""
+        url = reverse('index_more')
+        edit_url = reverse('post_edit', kwargs={
+            'username': 'author', 'post_id': FeedFragmentTest.posts[0].pk})
+        self.assertNotContains(self.guest_client.get(url), edit_url)
+        response = self.author_client.get(url)
+        self.assertTemplateNotUsed(response, 'includes/post_list.html')
+        self.assertContains(response, edit_url)
+        etag = response['ETag']
+        response = self.author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_objects(self):
+        for url in (reverse('group_more', kwargs={'slug': 'missing'}),
+                    reverse('profile_more', kwargs={'username': 'missing'})):
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, User
+
+
+@override_settings(PAGE_SHELL_CACHE=True)
+class PageShellCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(text='Текст поста', author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.profile_url = reverse(
+            'profile', kwargs={'username': self.author.username})
+        self.post_url = reverse('post', kwargs={
+            'username': self.author.username, 'post_id': self.post.pk})
+
+    def test_guest_served_from_cache(self):
+        """Повторный запрос гостя не выполняет view."""
+        first = self.guest_client.get(self.profile_url)
+        # Остается только поиск id автора для версии страницы
+        with self.assertNumQueries(1):
+            second = self.guest_client.get(self.profile_url)
+        self.assertTemplateNotUsed(second, 'profile.html')
+        self.assertEqual(first.content, second.content)
+        self.assertNotIn(b'<!--hole:', second.content)
+
+    def test_users_share_shell_with_personal_fragments(self):
+        """Пользователи получают общую оболочку со своими фрагментами."""
+        self.guest_client.get(self.post_url)
+        response = self.reader_client.get(self.post_url)
+        self.assertTemplateNotUsed(response, 'post.html')
+        content = response.content.decode()
+        self.assertIn('Пользователь: reader', content)
+        self.assertIn('Отписаться', content)
+        self.assertIn('csrfmiddlewaretoken', content)
+        self.assertNotIn(
+            reverse('post_edit', kwargs={'username': 'author',
+                                         'post_id': self.post.pk}), content)
+
+        content = self.author_client.get(self.post_url).content.decode()
+        self.assertIn('Пользователь: author', content)
+        self.assertIn(reverse('post_edit', kwargs={
+            'username': 'author', 'post_id': self.post.pk}), content)
+
+        content = self.guest_client.get(self.post_url).content.decode()
+        self.assertIn('Войти', content)
+        self.assertNotIn('csrfmiddlewaretoken', content)
+        self.assertNotIn('Отписаться', content)
+
+    def test_shell_invalidated_by_changes(self):
+        """Новый пост попадает в закэшированные страницы."""
+        self.guest_client.get(self.profile_url)
+        self.guest_client.get(reverse('index'))
+        Post.objects.create(text='Свежий пост', author=self.author)
+        for url in (self.profile_url, reverse('index')):
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_same_output_without_shell_cache(self):
+        """Страница без кэша оболочек совпадает со страницей из него."""
+        cached = self.author_client.get(self.post_url).content
+        with self.settings(PAGE_SHELL_CACHE=False):
+            cache.clear()
+            plain = self.author_client.get(self.post_url).content
+        # Токены CSRF маскируются заново на каждый ответ
+        strip = (lambda content: content.decode().split(
+            'csrfmiddlewaretoken')[0])
+        self.assertEqual(strip(cached), strip(plain))
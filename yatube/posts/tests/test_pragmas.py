@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase
+
+from posts import pragmas
+
+
+class PragmaTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_pragmas(self):
+        """Новое соединение получает прагмы из SQLITE_PRAGMAS."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Прагмы применяются только к SQLite')
+        pragmas = settings.SQLITE_PRAGMAS
+        self.assertEqual(self.pragma('busy_timeout'), pragmas['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), pragmas['cache_size'])
+        # NORMAL
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+    def test_immediate_transactions(self):
+        """atomic() открывает транзакцию с блокировкой записи."""
+        executed = []
+
+        def execute(sql, params, many, context):
+            executed.append(sql)
+
+        with self.settings(SQLITE_TRANSACTION_MODE='IMMEDIATE'):
+            for sql in ('BEGIN', 'SELECT 1'):
+                pragmas.begin(execute, sql, None, False, {})
+        self.assertEqual(executed, ['BEGIN IMMEDIATE', 'SELECT 1'])
+
+    def test_reconnect_keeps_one_wrapper(self):
+        """Переподключения не копят обертки BEGIN на соединении."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Прагмы применяются только к SQLite')
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+        wrapper = type(connections['default'])(
+            {**connection.settings_dict,
+             'NAME': os.path.join(data_dir, 'db.sqlite3')},
+            alias='reconnect')
+        wrapper.ensure_connection()
+        wrapper.close()
+        installed = list(wrapper.execute_wrappers)
+        for _ in range(5):
+            wrapper.ensure_connection()
+            wrapper.close()
+        self.assertEqual(wrapper.execute_wrappers, installed)
+        self.assertEqual(installed.count(pragmas.begin), 1)
+
+
+class StressTest(SimpleTestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+
+    def manage(self, *args):
+        env = dict(
+            os.environ,
+            DB_NAME=os.path.join(self.data_dir, 'db.sqlite3'),
+            SLOW_QUERY_LOG=os.path.join(self.data_dir, 'slow.log'),
+            DJANGO_SETTINGS_MODULE='yatube.settings',
+            SECRET_KEY=settings.SECRET_KEY or 'test',
+            ALLOWED_HOSTS=','.join(settings.ALLOWED_HOSTS))
+        subprocess.run(
+            [sys.executable, 'manage.py', *args],
+            cwd=settings.BASE_DIR, env=env, check=True,
+            stdout=subprocess.DEVNULL)
+
+    def test_concurrent_writes_without_locks(self):
+        """В режиме WAL читатели и писатели не получают database is locked."""
+        output = os.path.join(self.data_dir, 'stress.json')
+        self.manage('migrate', '-v0')
+        self.manage('stress_views', '--readers', '4', '--writers', '3',
+                    '--seconds', '1', '--output', output)
+        with open(output, encoding='utf-8') as file_:
+            report = json.load(file_)
+        self.assertEqual(report['journal_mode'], 'wal')
+        self.assertEqual(report['errors'], {})
+        self.assertGreater(report['reads']['requests'], 0)
+        self.assertGreater(report['writes']['requests'], 0)
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class FeedQueryBudgetTest(TestCase):
+    """
+    Число запросов страницы не зависит от числа постов на ней.
+    Страницы объектов делают один запрос для ETag: ищут id по ключу URL.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='test_name',
+            description='Тестовое описание группы')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedQueryBudgetTest.reader)
+
+    def add_posts(self, count):
+        for number in range(count):
+            post = Post.objects.create(
+                text=f'Текст поста {number}',
+                author=FeedQueryBudgetTest.authors[
+                    number % len(FeedQueryBudgetTest.authors)],
+                group=FeedQueryBudgetTest.group)
+            Comment.objects.create(
+                post=post,
+                author=FeedQueryBudgetTest.reader,
+                text='Комментарий')
+
+    def assert_budget(self, client, url, queries):
+        for count in (1, 9):
+            self.add_posts(count)
+            cache.clear()
+            with self.subTest(url=url, posts=count):
+                with self.assertNumQueries(queries):
+                    client.get(url)
+
+    def test_index_budget(self):
+        self.assert_budget(self.guest_client, reverse('index'), 1)
+
+    def test_group_budget(self):
+        self.assert_budget(
+            self.guest_client,
+            reverse('group', kwargs={'slug': FeedQueryBudgetTest.group.slug}),
+            3)
+
+    def test_profile_budget(self):
+        author = FeedQueryBudgetTest.authors[0]
+        self.assert_budget(
+            self.guest_client,
+            reverse('profile', kwargs={'username': author.username}),
+            3)
+
+    def test_follow_index_budget(self):
+        self.assert_budget(
+            self.authorized_client, reverse('follow_index'), 3)
+
+    def test_post_view_comments_budget(self):
+        post = Post.objects.create(
+            text='Текст поста', author=FeedQueryBudgetTest.authors[0])
+        url = reverse('post', kwargs={'username': post.author.username,
+                                      'post_id': post.id})
+        for count in (1, 9):
+            for number in range(count):
+                Comment.objects.create(
+                    post=post,
+                    author=FeedQueryBudgetTest.authors[
+                        number % len(FeedQueryBudgetTest.authors)],
+                    text='Комментарий')
+            with self.subTest(comments=count):
+                with self.assertNumQueries(3):
+                    self.guest_client.get(url)
+
+    def test_not_modified_budget(self):
+        """Ответ 304 обходится без запросов к постам."""
+        self.add_posts(9)
+        url = reverse('index')
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,73 @@
+from django.contrib.admin.sites import site
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.search import SQLiteFTSBackend, get_backend
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.cat_post = Post.objects.create(
+            text='Кот спит на диване', author=cls.user)
+        cls.cats_post = Post.objects.create(
+            text='Кот и кот: два кота на диване', author=cls.user)
+        cls.dog_post = Post.objects.create(
+            text='Собака гуляет во дворе', author=cls.user)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('search'), {'q': query, **params})
+        return response.context['page']
+
+    def test_backend_for_sqlite(self):
+        """Для SQLite выбирается поиск на FTS5."""
+        self.assertIsInstance(get_backend(), SQLiteFTSBackend)
+
+    def test_results_ranked(self):
+        """Более релевантный пост выводится первым."""
+        page = self.search('кот')
+        self.assertEqual(list(page),
+                         [SearchTest.cats_post, SearchTest.cat_post])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = SearchTest.dog_post
+        post.text = 'Кот прогнал собаку'
+        post.save()
+        self.assertIn(post, self.search('кот'))
+        self.assertNotIn(post, self.search('гуляет'))
+        post.delete()
+        self.assertNotIn(post, self.search('кот'))
+
+    def test_query_syntax_is_escaped(self):
+        """Спецсимволы FTS5 в запросе не ломают поиск."""
+        self.assertEqual(list(self.search('"кот* (')),
+                         [SearchTest.cats_post, SearchTest.cat_post])
+        self.assertEqual(list(self.search('***')), [])
+
+    def test_keyset_pages(self):
+        """Результаты листаются курсором без повторов."""
+        for number in range(12):
+            Post.objects.create(text=f'Кот номер {number}',
+                                author=SearchTest.user)
+        first = self.search('кот')
+        second = self.search('кот', after=first.paginator.next_cursor)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(len(second), 4)
+        self.assertEqual(len(set(first) | set(second)), 14)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке использует полнотекстовый индекс."""
+        model_admin = site._registry[Post]
+        request = RequestFactory().get('/')
+        queryset, _ = model_admin.get_search_results(
+            request, Post.objects.all(), 'собака')
+        self.assertEqual(list(queryset), [SearchTest.dog_post])
+        self.assertIn('posts_post_fts', str(queryset.query))
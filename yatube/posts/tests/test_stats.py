@@ -0,0 +1,164 @@
+import json
+from io import StringIO
+
+from django.core import serializers
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import AuthorStats, Comment, Follow, Post, User
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(AuthorStatsTest.reader)
+
+    def load_raw(self):
+        """Пост и подписка, загруженные как в loaddata, без сигналов."""
+        author = AuthorStatsTest.author.pk
+        rows = [
+            {'model': 'posts.post', 'fields': {
+                'text': 'Текст поста', 'author': author,
+                'pub_date': '2020-01-01T00:00:00Z'}},
+            {'model': 'posts.follow', 'fields': {
+                'user': AuthorStatsTest.reader.pk, 'author': author}},
+        ]
+        for row in serializers.deserialize('json', json.dumps(rows)):
+            row.save()
+
+    def stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_stats_created_with_user(self):
+        """Счетчики создаются вместе с пользователем."""
+        stats = self.stats(AuthorStatsTest.author)
+        self.assertEqual(
+            (stats.followers_count, stats.following_count,
+             stats.posts_count),
+            (0, 0, 0))
+
+    def test_follow_updates_counters(self):
+        """Подписка и отписка меняют счетчики обоих пользователей."""
+        kwargs = {'username': AuthorStatsTest.author.username}
+        self.authorized_client.get(reverse('profile_follow', kwargs=kwargs))
+        self.authorized_client.get(reverse('profile_follow', kwargs=kwargs))
+        self.assertEqual(
+            self.stats(AuthorStatsTest.author).followers_count, 1)
+        self.assertEqual(
+            self.stats(AuthorStatsTest.reader).following_count, 1)
+        self.authorized_client.get(
+            reverse('profile_unfollow', kwargs=kwargs))
+        self.assertEqual(
+            self.stats(AuthorStatsTest.author).followers_count, 0)
+        self.assertEqual(
+            self.stats(AuthorStatsTest.reader).following_count, 0)
+
+    def test_posts_counter(self):
+        """Создание и удаление поста меняют счетчик постов."""
+        post = Post.objects.create(
+            text='Текст поста', author=AuthorStatsTest.author)
+        self.assertEqual(self.stats(AuthorStatsTest.author).posts_count, 1)
+        post.delete()
+        self.assertEqual(self.stats(AuthorStatsTest.author).posts_count, 0)
+
+    def test_reconcile_repairs_drift(self):
+        """Команда reconcile_author_stats исправляет расхождения."""
+        Post.objects.create(text='Текст поста', author=AuthorStatsTest.author)
+        Follow.objects.create(
+            user=AuthorStatsTest.reader, author=AuthorStatsTest.author)
+        AuthorStats.objects.update(
+            followers_count=7, following_count=7, posts_count=7)
+        AuthorStats.objects.filter(user=AuthorStatsTest.reader).delete()
+        call_command('reconcile_author_stats', stdout=StringIO())
+        author = self.stats(AuthorStatsTest.author)
+        reader = self.stats(AuthorStatsTest.reader)
+        self.assertEqual(
+            (author.followers_count, author.following_count,
+             author.posts_count),
+            (1, 0, 1))
+        self.assertEqual(
+            (reader.followers_count, reader.following_count,
+             reader.posts_count),
+            (0, 1, 0))
+
+    def test_raw_rows_do_not_underflow(self):
+        """Удаление строк, загруженных без сигналов, не уводит в минус."""
+        self.load_raw()
+        Follow.objects.all().delete()
+        Post.objects.all().delete()
+        author = self.stats(AuthorStatsTest.author)
+        reader = self.stats(AuthorStatsTest.reader)
+        self.assertEqual(
+            (author.followers_count, author.posts_count), (0, 0))
+        self.assertEqual(reader.following_count, 0)
+
+    def test_reconcile_counts_raw_rows(self):
+        """reconcile_author_stats учитывает строки из loaddata."""
+        self.load_raw()
+        self.assertEqual(self.stats(AuthorStatsTest.author).posts_count, 0)
+        call_command('reconcile_author_stats', stdout=StringIO())
+        author = self.stats(AuthorStatsTest.author)
+        self.assertEqual(
+            (author.followers_count, author.posts_count), (1, 1))
+
+    def test_profile_card_does_not_count(self):
+        """Карточка автора не выполняет COUNT по подпискам и постам."""
+        Post.objects.create(text='Текст поста', author=AuthorStatsTest.author)
+        response = self.authorized_client.get(reverse(
+            'profile', kwargs={'username': AuthorStatsTest.author.username}))
+        self.assertContains(response, 'Кол-во постов: 1')
+        with self.assertNumQueries(0):
+            response.context['author'].stats.posts_count
+
+
+class CommentCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(text='Текст поста', author=cls.user)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CommentCountTest.user)
+
+    def test_comment_count_follows_comments(self):
+        """Счетчик комментариев меняется при добавлении и удалении."""
+        post = CommentCountTest.post
+        self.authorized_client.post(
+            reverse('add_comment', kwargs={'username': post.author,
+                                           'post_id': post.id}),
+            data={'text': 'Текст комментария'})
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+        post.comments.get().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 0)
+
+    def test_delete_loaded_comment(self):
+        """Удаление комментария из loaddata не уводит счетчик в минус."""
+        rows = [{'model': 'posts.comment', 'fields': {
+            'post': CommentCountTest.post.pk,
+            'author': CommentCountTest.user.pk,
+            'text': 'Комментарий', 'created': '2020-01-01T00:00:00Z'}}]
+        for row in serializers.deserialize('json', json.dumps(rows)):
+            row.save()
+        CommentCountTest.post.comments.get().delete()
+        post = Post.objects.get(pk=CommentCountTest.post.pk)
+        self.assertEqual(post.comment_count, 0)
+
+    def test_profile_shows_stored_count(self):
+        """Профиль показывает сохраненный счетчик комментариев."""
+        post = CommentCountTest.post
+        Comment.objects.create(
+            post=post, author=CommentCountTest.user, text='Комментарий')
+        response = self.authorized_client.get(
+            reverse('profile', kwargs={'username': post.author}))
+        self.assertContains(response, 'Комментариев: 1')
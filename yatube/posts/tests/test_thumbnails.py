@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.models import Post, User
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THUMBNAIL_BACKGROUND=False)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(
+            text='Текст поста',
+            author=cls.user,
+            image=SimpleUploadedFile(
+                name='thumb.gif', content=SMALL_GIF,
+                content_type='image/gif'))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_render_does_not_decode_image(self):
+        """Рендер без готовых вариантов не открывает изображение."""
+        post = ThumbnailTest.post
+        with mock.patch('posts.thumbnails.schedule') as schedule, \
+                mock.patch('PIL.Image.open') as image_open:
+            response = self.guest_client.get(
+                reverse('profile', kwargs={'username': post.author}))
+        image_open.assert_not_called()
+        schedule.assert_called_once_with(post.image.name)
+        self.assertContains(response, post.image.url)
+
+    def test_rendered_after_generation(self):
+        """После фоновой генерации выводится адаптивная картинка."""
+        post = ThumbnailTest.post
+        thumbnails.generate(post.image.name)
+        post.refresh_from_db()
+        sizes = {(item['format'], item['width'], item['height'])
+                 for item in post.image_sources}
+        self.assertEqual(sizes, {
+            (image_format, width, round(width * 339 / 960))
+            for image_format in ('webp', 'jpeg')
+            for width in settings.POST_IMAGE_WIDTHS})
+        response = self.guest_client.get(
+            reverse('profile', kwargs={'username': post.author}))
+        self.assertContains(response, '<source type="image/webp"')
+        self.assertContains(response, 'width="960" height="339"')
+        for item in post.image_sources:
+            with self.subTest(name=item['name']):
+                self.assertContains(response, f'{item["width"]}w')
+
+    def test_new_post_schedules_thumbnails(self):
+        """Новый пост с картинкой ставит варианты в очередь."""
+        client = Client()
+        client.force_login(ThumbnailTest.user)
+        with mock.patch('posts.thumbnails.schedule') as schedule, \
+                mock.patch('posts.thumbnails.transaction.on_commit',
+                           side_effect=lambda callback: callback()):
+            client.post(reverse('new_post'), data={
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile(
+                    name='new.gif', content=SMALL_GIF,
+                    content_type='image/gif')})
+        post = Post.objects.get(text='Пост с картинкой')
+        schedule.assert_called_once_with(post.image.name)
+
+    def test_failed_image_is_not_rebuilt_on_each_render(self):
+        """Битая картинка не собирается заново при каждом просмотре."""
+        cache.clear()
+        broken = Post.objects.create(
+            text='Битая картинка',
+            author=ThumbnailTest.user,
+            image=SimpleUploadedFile(
+                name='broken.gif', content=b'not an image',
+                content_type='image/gif'))
+        url = reverse('post', kwargs={
+            'username': broken.author, 'post_id': broken.pk})
+        with mock.patch('posts.thumbnails.logger') as logger, \
+                mock.patch('posts.thumbnails.build_variants',
+                           wraps=thumbnails.build_variants) as build:
+            self.guest_client.get(url)
+            self.guest_client.get(url)
+        build.assert_called_once()
+        logger.exception.assert_called_once()
+        broken.refresh_from_db()
+        self.assertEqual(broken.image_sources, [])
+
+    def test_failed_build_removes_written_variants(self):
+        """Сбой посреди сборки не оставляет части вариантов."""
+        post = ThumbnailTest.post
+        variants_dir = os.path.join(settings.MEDIA_ROOT, 'posts/variants')
+        os.makedirs(variants_dir, exist_ok=True)
+        before = set(os.listdir(variants_dir))
+        formats = thumbnails.FORMATS + (('bogus', 'BOGUS'),)
+        with mock.patch('posts.thumbnails.FORMATS', formats), \
+                self.assertRaises(KeyError):
+            thumbnails.build_variants(post)
+        self.assertEqual(set(os.listdir(variants_dir)), before)
+
+    def _variant_files(self, post):
+        return {item['name'] for item in post.image_sources
+                if os.path.exists(os.path.join(
+                    settings.MEDIA_ROOT, item['name']))}
+
+    def _post_with_variants(self, name):
+        post = Post.objects.create(
+            text='Пост с вариантами',
+            author=ThumbnailTest.user,
+            image=SimpleUploadedFile(
+                name=name, content=SMALL_GIF, content_type='image/gif'))
+        thumbnails.generate(post.image.name)
+        post.refresh_from_db()
+        return post
+
+    def test_rebuild_keeps_variant_names(self):
+        """Пересборка перезаписывает варианты, а не копит копии."""
+        post = self._post_with_variants('rebuild.gif')
+        first = self._variant_files(post)
+        thumbnails.generate(post.image.name)
+        post.refresh_from_db()
+        self.assertEqual(self._variant_files(post), first)
+        stem = os.path.splitext(os.path.basename(post.image.name))[0]
+        on_disk = [name for name in os.listdir(
+            os.path.join(settings.MEDIA_ROOT, 'posts/variants'))
+            if name.startswith(f'{stem}-')]
+        self.assertEqual(len(on_disk), len(first))
+
+    def test_variants_removed_with_image(self):
+        """Замена картинки и удаление поста убирают старые варианты."""
+        replaced = self._post_with_variants('replaced.gif')
+        deleted = self._post_with_variants('deleted.gif')
+        old_files = self._variant_files(replaced) | self._variant_files(
+            deleted)
+        self.assertEqual(len(old_files), 12)
+        client = Client()
+        client.force_login(ThumbnailTest.user)
+        with mock.patch('posts.thumbnails.schedule'), \
+                mock.patch('posts.thumbnails.transaction.on_commit',
+                           side_effect=lambda callback: callback()):
+            client.post(
+                reverse('post_edit', kwargs={
+                    'username': replaced.author, 'post_id': replaced.pk}),
+                data={'text': replaced.text, 'image': SimpleUploadedFile(
+                    name='other.gif', content=SMALL_GIF,
+                    content_type='image/gif')})
+            deleted.delete()
+        for name in old_files:
+            with self.subTest(name=name):
+                self.assertFalse(os.path.exists(
+                    os.path.join(settings.MEDIA_ROOT, name)))
+
+    @override_settings(THUMBNAIL_BACKGROUND=True)
+    def test_background_waits_for_commit(self):
+        """Фоновая задача уходит воркеру только после фиксации транзакции."""
+        name = ThumbnailTest.post.image.name
+        callbacks = []
+        with mock.patch('posts.thumbnails._get_executor') as get_executor, \
+                mock.patch('posts.thumbnails.transaction.on_commit',
+                           side_effect=callbacks.append):
+            thumbnails.schedule(name)
+            get_executor.assert_not_called()
+            callbacks[0]()
+        get_executor.return_value.submit.assert_called_once_with(
+            thumbnails.generate, name)
+        thumbnails._pending.discard(name)
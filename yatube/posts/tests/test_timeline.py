@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки', author=cls.author)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TimelineTest.reader)
+
+    def follow(self):
+        self.authorized_client.get(reverse(
+            'profile_follow',
+            kwargs={'username': TimelineTest.author.username}))
+
+    def feed(self):
+        response = self.authorized_client.get(reverse('follow_index'))
+        return list(response.context['page'])
+
+    def test_follow_backfills_timeline(self):
+        """Подписка добавляет в ленту старые посты автора."""
+        self.follow()
+        self.assertEqual(self.feed(), [TimelineTest.old_post])
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленту подписчика."""
+        self.follow()
+        self.authorized_client.force_login(TimelineTest.author)
+        self.authorized_client.post(
+            reverse('new_post'), data={'text': 'Свежий пост'})
+        new_post = Post.objects.get(text='Свежий пост')
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=TimelineTest.reader, post=new_post).exists())
+
+    def test_unfollow_trims_timeline(self):
+        """Отписка убирает посты автора из ленты."""
+        self.follow()
+        self.authorized_client.get(reverse(
+            'profile_unfollow',
+            kwargs={'username': TimelineTest.author.username}))
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTest.reader).exists())
+
+    def test_rebuild_command(self):
+        """Команда rebuild_timelines восстанавливает ленты."""
+        self.follow()
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.feed(), [TimelineTest.old_post])
+        self.assertEqual(Follow.objects.count(), 1)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import Client, TestCase
 
 from posts.models import Group, Post, User
@@ -18,6 +19,7 @@ class PostsURLTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.user_not_author = User.objects.get(username='dima_not_author')
         self.authorized_client_not_author = Client()
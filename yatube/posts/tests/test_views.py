@@ -1,16 +1,22 @@
 import shutil
 import tempfile
+from unittest import mock
 
 from django import forms
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.db import connection, transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from posts import feed_cache, thumbnails
 from posts.models import Comment, Group, Post, User
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THUMBNAIL_BACKGROUND=False)
 class PostsPagesTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -40,6 +46,8 @@ class PostsPagesTests(TestCase):
             group=Group.objects.get(title='test_name'),
             image=uploaded
         )
+        # Готовые варианты: рендер не будет ставить их в очередь
+        thumbnails.build_variants(cls.post)
 
     @classmethod
     def tearDownClass(cls):
@@ -47,6 +55,7 @@ class PostsPagesTests(TestCase):
         return super().tearDownClass()
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.user = User.objects.get(username='Dima')
         self.authorized_client = Client()
@@ -83,12 +92,21 @@ class PostsPagesTests(TestCase):
     def test_index_page_cache(self):
         """Проверка кэша index"""
         response_first = self.authorized_client.get(reverse('index'))
+        Post.objects.filter(pk=PostsPagesTests.post.pk).update(
+            text='Текст, измененный в обход сигналов')
+        response_second = self.authorized_client.get(reverse('index'))
+        self.assertEqual(response_first.content, response_second.content)
+
+    def test_index_page_cache_invalidated_by_new_post(self):
+        """Новый пост сбрасывает кэш index"""
+        response_first = self.authorized_client.get(reverse('index'))
         Post.objects.create(
-            text='Текст тестового поста',
+            text='Текст свежего тестового поста',
             author=User.objects.get(
                 username='Dima'))
         response_second = self.authorized_client.get(reverse('index'))
-        self.assertEqual(response_first.content, response_second.content)
+        self.assertNotEqual(response_first.content, response_second.content)
+        self.assertContains(response_second, 'Текст свежего тестового поста')
 
     def test_group_page_show_correct_context(self):
         """Шаблон group сформирован с правильным контекстом."""
@@ -194,8 +212,52 @@ class PaginatorViewsTest(TestCase):
 
     def test_second_page_contains_three_records(self):
         """Тестирование второй страницы паджинатора"""
-        response = self.guest_client.get(reverse('index') + '?page=2')
-        self.assertEqual(len(response.context.get('page').object_list), 3)
+        first = self.guest_client.get(reverse('index')).context['page']
+        response = self.guest_client.get(
+            reverse('index') + f'?after={first.paginator.next_cursor}')
+        page = response.context.get('page')
+        self.assertEqual(len(page.object_list), 3)
+        self.assertTrue(page.has_previous())
+        self.assertFalse(page.has_next())
+        self.assertEqual(len(set(first) & set(page)), 0)
+
+    def test_previous_page_returns_first_records(self):
+        """Курсор before возвращает к предыдущей странице"""
+        first = self.guest_client.get(reverse('index')).context['page']
+        second = self.guest_client.get(
+            reverse('index') + f'?after={first.paginator.next_cursor}'
+        ).context['page']
+        response = self.guest_client.get(
+            reverse('index') + f'?before={second.paginator.previous_cursor}')
+        page = response.context.get('page')
+        self.assertEqual(list(page.object_list), list(first.object_list))
+        self.assertFalse(page.has_previous())
+
+    def test_cached_pages_differ_by_cursor(self):
+        """Кэш не отдает карточки первой страницы на второй"""
+        first = self.guest_client.get(reverse('index'))
+        second = self.guest_client.get(
+            reverse('index')
+            + f'?after={first.context["page"].paginator.next_cursor}')
+        post = second.context['page'].object_list[0]
+        self.assertContains(second, f'name="post_{post.id}"')
+        self.assertNotContains(first, f'name="post_{post.id}"')
+
+    def test_broken_cursor_returns_first_page(self):
+        """Поврежденный курсор открывает первую страницу"""
+        response = self.guest_client.get(reverse('index') + '?after=broken')
+        page = response.context.get('page')
+        self.assertEqual(len(page.object_list), 10)
+        self.assertFalse(page.has_previous())
+
+    def test_page_does_not_count_rows(self):
+        """Страница не выполняет COUNT по всей таблице"""
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(reverse('index') + '?after=broken')
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT COUNT(')
+            and 'FROM "posts_post"' in query['sql']
+            for query in queries))
 
 
 class PostWithGroupTests(TestCase):
@@ -353,3 +415,65 @@ class CommentTest(TestCase):
                 post=post
             ).exists()
         )
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='test_name',
+            description='Тестовое описание группы')
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(
+            text='Текст поста', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_comment_invalidates_profile_and_group(self):
+        """Комментарий сбрасывает кэш профиля и группы"""
+        post = FeedCacheTest.post
+        urls = (reverse('profile', kwargs={'username': post.author}),
+                reverse('group', kwargs={'slug': post.group.slug}))
+        for url in urls:
+            self.guest_client.get(url)
+        Comment.objects.create(
+            post=post, author=FeedCacheTest.user, text='Комментарий')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.guest_client.get(url), 'Комментариев: 1')
+
+    @override_settings(FEED_VERSION_TIMEOUT=20)
+    def test_versions_expire_without_shared_cache(self):
+        """Версии в кэше процесса устаревают и перечитываются заново"""
+        with mock.patch('posts.feed_cache.cache') as cache_mock:
+            cache_mock.get_many.return_value = {}
+            feed_cache.bump('index')
+            feed_cache.versions('index')
+        self.assertEqual(cache_mock.set_many.call_args[0][1], 20)
+        self.assertEqual(cache_mock.add.call_args[0][2], 20)
+
+    def test_group_move_invalidates_old_group(self):
+        """Перенос поста в другую группу сбрасывает кэш прежней"""
+        post = FeedCacheTest.post
+        url = reverse('group', kwargs={'slug': post.group.slug})
+        self.assertContains(self.guest_client.get(url), 'Текст поста')
+        post.group = Group.objects.create(
+            title='other', description='Другая группа')
+        post.save()
+        self.assertNotContains(self.guest_client.get(url), 'Текст поста')
+
+
+class FeedCacheCommitTest(TransactionTestCase):
+    def test_versions_bumped_after_commit(self):
+        """Версии лент сдвигаются повторно после коммита транзакции"""
+        user = User.objects.create_user(username='user')
+        with transaction.atomic():
+            Post.objects.create(text='Текст поста', author=user)
+            # Читатель мог закэшировать ленту до коммита под этой версией
+            before_commit = feed_cache.versions('index', f'author:{user.pk}')
+        self.assertNotEqual(
+            feed_cache.versions('index', f'author:{user.pk}'),
+            before_commit)
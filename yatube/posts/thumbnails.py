@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from . import feed_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Пропорции карточки поста и форматы вариантов: сначала современный,
+# последним — запасной, который понимают все браузеры
+CARD_ASPECT = (960, 339)
+FORMATS = (('webp', 'WEBP'), ('jpeg', 'JPEG'))
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='thumbnails')
+        return _executor
+
+
+def _failed_key(name):
+    return f'thumbnails:failed:{name}'
+
+
+def _widths():
+    return sorted(getattr(settings, 'POST_IMAGE_WIDTHS', (320, 640, 960)))
+
+
+def build_variants(post):
+    """
+    Строит набор ширин карточки в WebP и JPEG и сохраняет их
+    описание (формат, размеры, имя файла) в post.image_variants.
+    """
+    widths = _widths()
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    quality = getattr(settings, 'POST_IMAGE_QUALITY', 80)
+    variants = []
+    saved = []
+    with post.image.open('rb') as file_, Image.open(file_) as source:
+        # JPEG можно декодировать сразу в уменьшенном масштабе
+        source.draft('RGB', (widths[-1], widths[-1]))
+        image = ImageOps.exif_transpose(source).convert('RGB')
+    try:
+        for width in widths:
+            height = round(width * CARD_ASPECT[1] / CARD_ASPECT[0])
+            resized = ImageOps.fit(image, (width, height), Image.LANCZOS)
+            for format_name, pillow_format in FORMATS:
+                buffer = BytesIO()
+                resized.save(buffer, pillow_format, quality=quality)
+                # Имя постоянное: пересборка заменяет прежний файл,
+                # а не копит копии с суффиксами
+                name = (f'posts/variants/{stem}-{width}.'
+                        f'{EXTENSIONS[format_name]}')
+                default_storage.delete(name)
+                name = default_storage.save(
+                    name, ContentFile(buffer.getvalue()))
+                saved.append(name)
+                variants.append({'format': format_name, 'width': width,
+                                 'height': height, 'name': name})
+    except Exception:
+        # Неполный набор вариантов не нужен: убираем уже записанные файлы
+        for name in saved:
+            default_storage.delete(name)
+        raise
+    Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image_variants=json.dumps(variants))
+
+
+def generate(name):
+    """
+    Строит варианты изображения для всех постов с ним и сбрасывает
+    кэш лент, где фрагменты еще ссылаются на оригинал.
+    Выполняется в фоновом воркере. Неудача запоминается на
+    THUMBNAIL_RETRY_TIMEOUT, чтобы рендер не ставил битую картинку
+    в очередь на каждом просмотре.
+    """
+    try:
+        for post in Post.objects.filter(image=name).only(
+                'pk', 'author_id', 'group_id', 'image'):
+            build_variants(post)
+            feed_cache.bump(*feed_cache.post_scopes(post))
+    except Exception:
+        logger.exception('Не удалось построить варианты для %s', name)
+        cache.set(_failed_key(name), True, getattr(
+            settings, 'THUMBNAIL_RETRY_TIMEOUT', 3600))
+    finally:
+        _pending.discard(name)
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+
+def schedule(name):
+    """
+    Ставит построение вариантов в очередь фонового воркера. Задача
+    уходит после фиксации текущей транзакции: у воркера свое соединение,
+    и незафиксированного поста он бы не увидел.
+    """
+    if not name or name in _pending or cache.get(_failed_key(name)):
+        return
+    if not getattr(settings, 'THUMBNAIL_BACKGROUND', True):
+        generate(name)
+        return
+
+    def submit():
+        if name not in _pending:
+            _pending.add(name)
+            _get_executor().submit(generate, name)
+
+    transaction.on_commit(submit)
+
+
+def discard(variants, image_name):
+    """
+    Удаляет файлы вариантов после фиксации транзакции, если
+    оригинал image_name больше не нужен ни одному посту.
+    """
+    names = [item['name'] for item in variants]
+    if not names:
+        return
+
+    def delete():
+        if Post.objects.filter(image=image_name).exists():
+            return
+        for name in names:
+            default_storage.delete(name)
+
+    transaction.on_commit(delete)
+
+
+def schedule_for(post):
+    """Планирует варианты после фиксации транзакции с постом."""
+    if post.image:
+        name = post.image.name
+        transaction.on_commit(lambda: schedule(name))
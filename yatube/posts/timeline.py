@@ -0,0 +1,55 @@
+from django.conf import settings
+
+from .models import Follow, Post, TimelineEntry
+
+BATCH_SIZE = 500
+
+
+def _backfill_limit():
+    return getattr(settings, 'TIMELINE_BACKFILL_LIMIT', 1000)
+
+
+def _bulk_insert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def fan_out(post):
+    """Раскладывает новый пост в ленты подписчиков автора."""
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    _bulk_insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator())
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id').values_list('id', 'pub_date')
+    limit = _backfill_limit()
+    if limit is not None:
+        posts = posts[:limit]
+    _bulk_insert(
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator())
+
+
+def trim(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+def rebuild(user_ids=None):
+    """Пересобирает ленты с нуля по текущим подпискам."""
+    entries = TimelineEntry.objects.all()
+    follows = Follow.objects.filter(
+        user__isnull=False, author__isnull=False)
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        follows = follows.filter(user_id__in=user_ids)
+    entries.delete()
+    pairs = follows.values_list('user_id', 'author_id').distinct()
+    for user_id, author_id in pairs.iterator():
+        backfill(user_id, author_id)
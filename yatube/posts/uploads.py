@@ -0,0 +1,96 @@
+import os
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+
+def max_bytes():
+    return getattr(settings, 'POST_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загрузку сразу во временный файл, не держа ее в памяти,
+    и перестает писать, как только превышен лимит размера.
+    Такой файл помечается атрибутом oversized.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= max_bytes():
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.oversized = file_size > max_bytes()
+        return upload
+
+
+def limited_uploads(view):
+    """
+    Принимает файлы view через LimitedTemporaryFileUploadHandler.
+    Обработчики нужно сменить до чтения POST, а CsrfViewMiddleware
+    читает его раньше view, поэтому проверка CSRF перенесена внутрь.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def set_handlers(request, *args, **kwargs):
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return set_handlers
+
+
+def bound_image(upload):
+    """
+    Проверяет размеры картинки по заголовку, не декодируя пикселей.
+    Картинки больше POST_IMAGE_MAX_PIXELS уменьшаются: JPEG декодируется
+    сразу в уменьшенном масштабе (draft), остальные форматы отклоняются.
+    Больше POST_IMAGE_REJECT_PIXELS не принимается ничего.
+    """
+    max_pixels = getattr(settings, 'POST_IMAGE_MAX_PIXELS', 12_000_000)
+    reject_pixels = getattr(settings, 'POST_IMAGE_REJECT_PIXELS', 50_000_000)
+    upload.seek(0)
+    with Image.open(upload) as image:
+        width, height = image.size
+        pixels = width * height
+        if pixels <= max_pixels:
+            upload.seek(0)
+            return upload
+        if pixels > reject_pixels or image.format != 'JPEG':
+            raise ValidationError(
+                'Слишком большое изображение: %(width)s×%(height)s.',
+                code='image_too_large',
+                params={'width': width, 'height': height})
+        scale = (max_pixels / pixels) ** 0.5
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        image.draft('RGB', target)
+        image.thumbnail(target, Image.LANCZOS)
+        # Пиксели читаются из загрузки до того, как она будет перезаписана
+        resized = image.convert('RGB')
+    return _save_jpeg(resized, upload)
+
+
+def _save_jpeg(image, upload):
+    """
+    Перезаписывает загрузку уменьшенной картинкой. Отдельный временный
+    файл хранилище переместило бы, и его удаление в __del__ падало бы;
+    файл загрузки закрывает сам Django в конце запроса.
+    """
+    upload.seek(0)
+    upload.truncate()
+    image.save(upload, 'JPEG', quality=90)
+    upload.size = upload.tell()
+    upload.seek(0)
+    upload.name = os.path.splitext(upload.name)[0] + '.jpg'
+    upload.content_type = 'image/jpeg'
+    return upload
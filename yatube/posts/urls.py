@@ -1,9 +1,10 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('more/', views.index_more, name='index_more'),
     path('follow/', views.follow_index, name='follow_index'),
     path('<str:username>/follow/',
          views.profile_follow,
@@ -12,11 +13,23 @@ urlpatterns = [
          views.profile_unfollow,
          name="profile_unfollow"),
     path('new/', views.new_post, name='new_post'),
+    path('search/', views.search, name='search'),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
     path('group/<slug:slug>/', views.group_posts, name='group'),
+    path('group/<slug:slug>/more/', views.group_more, name='group_more'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
     path('<str:username>/', views.profile, name='profile'),
+    path('<str:username>/more/', views.profile_more, name='profile_more'),
+    path('<str:username>/rss/', feeds.profile_rss, name='profile_rss'),
+    path('<str:username>/atom/', feeds.profile_atom, name='profile_atom'),
     path('<str:username>/<int:post_id>/comment',
          views.add_comment,
          name='add_comment'),
+    path('<str:username>/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('<str:username>/<int:post_id>/edit/',
          views.post_edit,
          name='post_edit'),
@@ -1,33 +1,70 @@
+from urllib.parse import urlencode
+
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .decorators import only_author
+from . import feed_cache, follow_graph, freshness, thumbnails
+from .decorators import cached_shell, conditional_page, only_author
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .paginator import CursorPaginator
+from .search import SearchPaginator
+from .uploads import limited_uploads
 
 posts_on_page = 10
+comments_on_page = 20
+
+
+def paginate(request, object_list, **kwargs):
+    paginator = CursorPaginator(object_list, posts_on_page, **kwargs)
+    return paginator.get_page(after=request.GET.get('after'),
+                              before=request.GET.get('before'))
+
+
+def paginate_comments(request, post):
+    """Комментарии по порядку добавления, страница после курсора after."""
+    paginator = CursorPaginator(
+        post.comments.select_related('author'), comments_on_page,
+        keys=('created', 'id'))
+    return paginator.get_page(after=request.GET.get('after'))
 
 
+@conditional_page('index', freshness.index_scopes)
+@cached_shell('index', freshness.index_scopes)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, posts_on_page)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'index.html', {'page': page, })
+    post_list = Post.objects.for_feed()
+    page = paginate(request, post_list)
+    return render(request, 'index.html', {'page': page,
+                                          **feed_cache.context('index')})
+
+
+def render_more(request, post_list):
+    """Следующая порция карточек постов для бесконечной прокрутки."""
+    page = paginate(request, post_list)
+    return render(request, 'includes/post_list.html', {
+        'page': page,
+        'more_url': request.path})
+
+
+@conditional_page('index_more', freshness.index_scopes)
+@cached_shell('index_more', freshness.index_scopes)
+def index_more(request):
+    return render_more(request, Post.objects.for_feed())
 
 
 @login_required
 def follow_index(request):
-    request_user = request.user
-    post_list = Post.objects.filter(author__following__user=request_user)
-    paginator = Paginator(post_list, posts_on_page)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    entries = request.user.timeline.select_related(
+        'post__author', 'post__group')
+    page = paginate(request, entries, keys=('-pub_date', '-post_id'))
+    page.object_list = [entry.post for entry in page.object_list]
     return render(request, "follow.html", {'page': page, })
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     user = request.user
     following_author = get_object_or_404(User, username=username)
@@ -39,6 +76,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     user = request.user
     unfollowing_author = get_object_or_404(User, username=username)
@@ -47,40 +85,68 @@ def profile_unfollow(request, username):
     return redirect('profile', username)
 
 
+@conditional_page('profile', freshness.profile_scopes)
+@cached_shell('profile', freshness.profile_scopes)
 def profile(request, username):
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    following = follow_graph.follows(request.user, author)
+    post_list = author.posts.for_feed()
+    page = paginate(request, post_list)
+    return render(request, 'profile.html', {
+        'author': author,
+        'page': page,
+        'following': following,
+        **feed_cache.context(f'author:{author.pk}')})
+
+
+@conditional_page('profile_more', freshness.profile_scopes)
+@cached_shell('profile_more', freshness.profile_scopes)
+def profile_more(request, username):
     author = get_object_or_404(User, username=username)
-    following = ((not request.user.is_anonymous)
-                 and (Follow.objects.filter(
-                     user=request.user,
-                     author=author
-                 ).exists()))
-    post_list = author.posts.all()
-    paginator = Paginator(post_list, posts_on_page)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'profile.html', {'author': author,
-                                            'page': page,
-                                            'following': following})
+    return render_more(request, author.posts.for_feed())
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = SearchPaginator(Post.objects.for_feed(), posts_on_page, query)
+    page = paginator.get_page(after=request.GET.get('after'),
+                              before=request.GET.get('before'))
+    return render(request, 'search.html', {
+        'page': page,
+        'query': query,
+        'page_query': urlencode({'q': query})})
+
+
+@conditional_page('group', freshness.group_scopes)
+@cached_shell('group', freshness.group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.group_posts.all()
-    paginator = Paginator(posts, posts_on_page)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'group.html', {'group': group, 'page': page})
+    posts = group.group_posts.for_feed()
+    page = paginate(request, posts)
+    return render(request, 'group.html', {
+        'group': group,
+        'page': page,
+        **feed_cache.context(f'group:{group.pk}')})
+
+
+@conditional_page('group_more', freshness.group_scopes)
+@cached_shell('group_more', freshness.group_scopes)
+def group_more(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return render_more(request, group.group_posts.for_feed())
 
 
+@conditional_page('post', freshness.post_scopes)
+@cached_shell('post', freshness.post_scopes)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__stats'),
+        author__username=username,
+        id=post_id)
     author = post.author
-    following = ((not request.user.is_anonymous)
-                 and (Follow.objects.filter(
-                     user=request.user,
-                     author=author
-                 ).exists()))
-    comments = post.comments.all()
+    following = follow_graph.follows(request.user, author)
+    comments = paginate_comments(request, post)
     form = CommentForm(request.POST or None)
     return render(request, 'post.html', {'author': author,
                                          'post': post,
@@ -89,6 +155,32 @@ def post_view(request, username, post_id):
                                          'following': following})
 
 
+@conditional_page('post_comments', freshness.post_scopes)
+def post_comments(request, username, post_id):
+    """
+    Следующая страница комментариев для кнопки «Показать еще»:
+    HTML-фрагмент или JSON при ?format=json.
+    """
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        author__username=username,
+        id=post_id)
+    comments = paginate_comments(request, post)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [{
+                'id': comment.id,
+                'author': comment.author.username,
+                'text': comment.text,
+                'created': comment.created,
+            } for comment in comments],
+            'next': comments.paginator.next_cursor,
+        })
+    return render(request, 'includes/comment_list.html', {
+        'post': post,
+        'comments': comments})
+
+
 @login_required
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
@@ -101,17 +193,21 @@ def add_comment(request, username, post_id):
     return redirect('post', username, post_id)
 
 
+@limited_uploads
 @login_required
+@transaction.atomic
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        thumbnails.schedule_for(post)
         return redirect('index')
     return render(request, 'new_post.html', {'form': form})
 
 
+@limited_uploads
 @login_required
 @only_author
 def post_edit(request, username, post_id):
@@ -119,7 +215,11 @@ def post_edit(request, username, post_id):
     form = PostForm(
         request.POST or None, files=request.FILES or None, instance=post)
     if form.is_valid():
-        form.save()
+        if 'image' in form.changed_data:
+            form.instance.image_variants = ''
+        post = form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule_for(post)
         return redirect('post', username, post_id)
     return render(request, 'new_post.html', {'form': form, 'post': post})
 
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.checks import Tags, Warning, register
+from django.db import DatabaseError
+from django.urls import get_resolver
+
+
+def _first_segments(patterns):
+    for pattern in patterns:
+        segment = str(pattern.pattern).lstrip('^').split('/')[0]
+        if segment and '<' not in segment:
+            yield segment
+        elif not segment and hasattr(pattern, 'url_patterns'):
+            # include('') — его адреса тоже лежат в корне сайта
+            yield from _first_segments(pattern.url_patterns)
+
+
+def reserved_usernames():
+    """
+    Первые части адресов сайта (new, search, rss, ...). Они стоят
+    перед <username>/ в urls.py, и пользователь с таким именем
+    не увидел бы своего профиля.
+    """
+    return frozenset(_first_segments(get_resolver().url_patterns))
+
+
+@register(Tags.database)
+def reserved_username_check(app_configs, **kwargs):
+    """Предупреждает о существующих аккаунтах с занятыми именами."""
+    try:
+        taken = list(get_user_model().objects.filter(
+            username__in=reserved_usernames()).values_list(
+            'username', flat=True))
+    except DatabaseError:
+        # Таблицы еще нет: migrate запускает проверку до миграций
+        return []
+    return [
+        Warning(
+            f'Профиль пользователя {username!r} закрыт адресом сайта '
+            f'/{username}/.',
+            hint='Переименуйте пользователя.',
+            id='users.W001')
+        for username in taken]
@@ -1,6 +1,9 @@
+from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 
+from .checks import reserved_usernames
+
 User = get_user_model()
 
 
@@ -8,3 +11,10 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ("first_name", "last_name", "username", "email")
+
+    def clean_username(self):
+        username = self.cleaned_data["username"]
+        if username in reserved_usernames():
+            raise forms.ValidationError(
+                "Это имя занято адресом сайта.", code="reserved_username")
+        return username
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.test import Client, TestCase
+from django.urls import resolve, reverse
+
+from users.checks import reserved_username_check, reserved_usernames
+
+User = get_user_model()
+
+
+class ReservedUsernameTest(TestCase):
+    def test_site_paths_reserved(self):
+        """Адреса перед <username>/ в urls.py заняты."""
+        self.assertTrue({'search', 'new', 'follow'} <= reserved_usernames())
+
+    def test_more_path_reserved(self):
+        """/more/ отдает следующую порцию ленты, а не профиль."""
+        self.assertIn('more', reserved_usernames())
+        self.assertEqual(resolve('/more/').url_name, 'index_more')
+
+    def test_feed_paths_reserved(self):
+        """Общие ленты /rss/ и /atom/ не закрывают профиль."""
+        self.assertTrue({'rss', 'atom'} <= reserved_usernames())
+
+    def test_signup_rejects_reserved(self):
+        response = Client().post(reverse('signup'), {
+            'username': 'more',
+            'password1': 'Sup3r-secret-pass',
+            'password2': 'Sup3r-secret-pass',
+        })
+        self.assertFormError(response, 'form', 'username',
+                             'Это имя занято адресом сайта.')
+        self.assertFalse(User.objects.filter(username='more').exists())
+
+    def test_existing_accounts_reported(self):
+        """Проверка базы находит аккаунты, которые заняли адрес сайта."""
+        User.objects.create_user(username='rss')
+        User.objects.create_user(username='reader')
+        issues = reserved_username_check(None)
+        self.assertEqual([issue.id for issue in issues], ['users.W001'])
+        self.assertIn("'rss'", issues[0].msg)
+        self.assertIn(reserved_username_check,
+                      checks.registry.registry.get_checks(
+                          include_deployment_checks=False))
@@ -0,0 +1,53 @@
+from urllib.parse import unquote, urlsplit
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'pylibmc': 'django.core.cache.backends.memcached.PyLibMCCache',
+    'redis': 'django_redis.cache.RedisCache',
+    'rediss': 'django_redis.cache.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+# Бэкенды, которые не делят записи между процессами
+LOCAL_SCHEMES = {'locmem', 'dummy'}
+
+
+def parse_cache_url(url, key_prefix='', version=1, timeout=300):
+    """
+    Собирает настройку кэша из URL вида:
+      locmem://              — память процесса (по умолчанию);
+      file:///var/tmp/yatube — файловый кэш, общий для процессов;
+      db://yatube_cache      — таблица БД (manage.py createcachetable);
+      memcached://h1:11211,h2:11211 (python-memcached),
+      pylibmc://h1:11211 (pylibmc) и redis://host:6379/1.
+    Для redis нужен пакет django-redis.
+    """
+    parts = urlsplit(url or 'locmem://')
+    scheme = parts.scheme.lower()
+    if scheme not in BACKENDS:
+        raise ValueError(f'Неизвестная схема кэша: {scheme!r}')
+    config = {
+        'BACKEND': BACKENDS[scheme],
+        'KEY_PREFIX': key_prefix,
+        'VERSION': int(version),
+        'TIMEOUT': int(timeout),
+    }
+    if scheme == 'file':
+        config['LOCATION'] = unquote(parts.path)
+    elif scheme == 'db':
+        config['LOCATION'] = parts.netloc or parts.path.strip('/')
+    elif scheme in ('memcached', 'pylibmc'):
+        config['LOCATION'] = parts.netloc.split(',')
+    elif scheme in ('redis', 'rediss'):
+        config['LOCATION'] = url
+    elif scheme == 'locmem':
+        config['LOCATION'] = parts.netloc
+    return config
+
+
+def is_shared(url):
+    """Кэш общий для всех воркеров: сдвиг версии видят все процессы."""
+    return urlsplit(url or 'locmem://').scheme.lower() not in LOCAL_SCHEMES
@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+STICKY_COOKIE = 'db_primary_until'
+
+# Сессии и кэш в таблице БД читаются только с основной базы:
+# отставшая реплика разлогинит пользователя или вернет старые версии лент.
+# Их записи бывают почти у каждого посетителя и не включают прилипание
+PRIMARY_ONLY_APPS = {'sessions', 'django_cache'}
+
+_state = threading.local()
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def check_connections():
+    """
+    Проверка сохраненных соединений перед запросом: соединение,
+    переставшее отвечать (перезапуск базы, обрыв по таймауту), закрывается
+    и будет открыто заново при первом обращении.
+    """
+    for connection in connections.all():
+        if (connection.connection is not None
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
+
+
+def _healthy(alias):
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+    except DatabaseError:
+        return False
+    return connection.is_usable()
+
+
+def choose_replica():
+    """Случайная доступная реплика или None, если доступных нет."""
+    aliases = replicas()
+    random.shuffle(aliases)
+    return next((alias for alias in aliases if _healthy(alias)), None)
+
+
+def reading_replica():
+    """Чтения текущего запроса идут на реплику."""
+    return getattr(_state, 'replica', None) is not None
+
+
+def replica_reads():
+    """Счетчик чтений с реплики в текущем потоке."""
+    return getattr(_state, 'replica_reads', 0)
+
+
+@contextmanager
+def primary():
+    """
+    Чтения внутри блока идут в основную базу. Нужен там, где результат
+    попадает в общий кэш под текущей версией: данные отставшей реплики
+    остались бы в нем до следующего изменения.
+    """
+    replica = getattr(_state, 'replica', None)
+    _state.replica = None
+    try:
+        yield
+    finally:
+        _state.replica = replica
+
+
+def is_sticky(request):
+    """Пользователь недавно писал и должен читать свои записи."""
+    try:
+        until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+class ReplicaRouter:
+    """
+    Чтения view из READ_REPLICA_VIEWS уходят на реплику, выбранную
+    ReplicaMiddleware на весь запрос; остальные чтения и все записи —
+    на основную базу. Записи моделей приложений отмечаются, чтобы
+    включить прилипание.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(_state, 'replica', None)
+        if replica and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            _state.replica_reads = replica_reads() + 1
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS:
+            _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и на основной базе
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема реплик приходит с основной базы
+        return False if db in replicas() else None
+
+
+class ReplicaMiddleware:
+    """
+    Проверяет соединения, выбирает реплику для view только для чтения
+    и после записи на REPLICA_STICKY_SECONDS ставит куку, с которой
+    пользователь читает с основной базы и сразу видит свой пост.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        check_connections()
+        _state.replica = None
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.replica = None
+        if _state.wrote:
+            sticky = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(
+                STICKY_COOKIE, f'{time.time() + sticky:.0f}',
+                max_age=sticky, httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (replicas()
+                and request.method in ('GET', 'HEAD')
+                and match.url_name in getattr(
+                    settings, 'READ_REPLICA_VIEWS', ())
+                and not is_sticky(request)):
+            _state.replica = choose_replica()
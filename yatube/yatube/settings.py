@@ -2,6 +2,8 @@ import os
 
 from dotenv import load_dotenv
 
+from .cache_url import is_shared, parse_cache_url
+
 load_dotenv()
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -31,11 +33,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'posts',
     'about',
+    'monitoring',
+    'api',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
+    'yatube.db_router.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,9 +48,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Панель отладки показывается только при DEBUG, а ее middleware
+# замедляет каждый запрос, поэтому в продакшене она не подключается
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -56,7 +66,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'monitoring.templates.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -89,9 +99,46 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        # Соединение переживает запрос и переиспользуется; перед каждым
+        # запросом ReplicaMiddleware проверяет, что оно живо
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+    }
+}
+
+# Реплики только для чтения через запятую, например файлы-копии SQLite:
+# DB_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+# (manage.py sync_replicas копирует в них основную базу)
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+# Прагмы каждого нового соединения SQLite (posts.pragmas). WAL пускает
+# читателей параллельно с записью, NORMAL не ждет fsync на каждый коммит,
+# busy_timeout ждет блокировку вместо ошибки database is locked
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Отрицательное значение — размер в КиБ, а не в страницах
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024)),
 }
+# Транзакции atomic() сразу берут блокировку записи (BEGIN IMMEDIATE)
+SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+
+DATABASE_ROUTERS = ['yatube.db_router.ReplicaRouter']
+# Имена URL, которые читают с реплик. Общие кэши (оболочки страниц,
+# подписки) все равно заполняются с основной базы
+READ_REPLICA_VIEWS = ['index', 'group', 'profile', 'post']
+# Столько секунд после записи пользователь читает с основной базы
+REPLICA_STICKY_SECONDS = 10
 
 
 # Password validation
@@ -144,9 +191,96 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 # Cache
+# CACHE_URL выбирает бэкенд, общий для всех воркеров: file:///path,
+# db://table, memcached://host:port или redis://host:port/db
 
+CACHE_URL = os.getenv('CACHE_URL', 'locmem://')
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    'default': parse_cache_url(
+        CACHE_URL,
+        key_prefix=os.getenv('CACHE_KEY_PREFIX', 'yatube'),
+        version=os.getenv('CACHE_VERSION', 1),
+        timeout=os.getenv('CACHE_TIMEOUT', 300)),
+}
+
+# Фрагменты лент инвалидируются по версии, поэтому TTL может быть долгим.
+# Но версии сдвигаются только в кэше того воркера, где была запись: без
+# общего кэша остальные отдавали бы старое, поэтому TTL короткий, а сами
+# версии тоже устаревают
+SHARED_CACHE = is_shared(CACHE_URL)
+FEED_CACHE_TIMEOUT = 60 * 60 if SHARED_CACHE else 20
+FEED_VERSION_TIMEOUT = None if SHARED_CACHE else FEED_CACHE_TIMEOUT
+
+# Ленты, профили и посты целиком кэшируются как общая для всех оболочка;
+# персональные фрагменты подставляются в нее на каждый запрос. Только
+# с общим кэшем: иначе другие воркеры не увидят сдвига версий
+PAGE_SHELL_CACHE = SHARED_CACHE
+PAGE_SHELL_CACHE_TIMEOUT = FEED_CACHE_TIMEOUT
+
+# Варианты картинок строятся в фоновых потоках, а не во время рендера
+THUMBNAIL_BACKGROUND = True
+THUMBNAIL_WORKERS = 2
+# Сколько секунд не пытаться снова собрать варианты битой картинки
+THUMBNAIL_RETRY_TIMEOUT = 60 * 60
+
+# Ширины адаптивных вариантов картинки поста (WebP и запасной JPEG)
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_QUALITY = 80
+
+# Загрузки
+
+# Картинки постов пишутся на диск по частям, а не собираются в памяти,
+# см. posts.uploads.limited_uploads
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+# Больше этого числа пикселей JPEG уменьшается, остальное отклоняется
+POST_IMAGE_MAX_PIXELS = 12_000_000
+POST_IMAGE_REJECT_PIXELS = 50_000_000
+
+# API
+
+# Размер страницы лент API; клиент может запросить ?limit= до максимума
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Метрики
+
+# Общая папка, через которую воркеры складывают метрики для /metrics/;
+# без нее каждый процесс отдает только свои значения
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+# Если задан, /metrics/ требует заголовок Authorization: Bearer <токен>
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Медленные запросы
+
+# Запросы дольше порога пишутся с планом выполнения в отдельный лог
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100))
+# Не больше стольких записей в минуту на процесс
+SLOW_QUERY_LOG_RATE = 60
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.getenv(
+                'SLOW_QUERY_LOG', os.path.join(BASE_DIR, 'slow_queries.log')),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'monitoring.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
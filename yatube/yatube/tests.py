@@ -0,0 +1,212 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from . import db_router
+from .cache_url import is_shared, parse_cache_url
+
+CACHE_SCRIPT = '''
+import sys
+from io import StringIO
+
+import django
+django.setup()
+from django.core.cache import cache
+if sys.argv[1] == "set":
+    cache.set("shared_key", "из первого процесса", 60)
+else:
+    print(cache.get("shared_key"))
+'''
+
+
+class CacheUrlTest(SimpleTestCase):
+    def test_backends_from_url(self):
+        """URL кэша превращается в настройку нужного бэкенда."""
+        cases = {
+            'locmem://': ('locmem.LocMemCache', ''),
+            'file:///var/tmp/yatube': (
+                'filebased.FileBasedCache', '/var/tmp/yatube'),
+            'db://yatube_cache': ('db.DatabaseCache', 'yatube_cache'),
+            'memcached://h1:11211,h2:11211': (
+                'memcached.MemcachedCache', ['h1:11211', 'h2:11211']),
+            'pylibmc://h1:11211': ('memcached.PyLibMCCache', ['h1:11211']),
+            'redis://localhost:6379/1': (
+                'django_redis.cache.RedisCache', 'redis://localhost:6379/1'),
+        }
+        for url, (backend, location) in cases.items():
+            with self.subTest(url=url):
+                config = parse_cache_url(url, key_prefix='yt', version=3)
+                self.assertTrue(config['BACKEND'].endswith(backend))
+                self.assertEqual(config['LOCATION'], location)
+                self.assertEqual(config['KEY_PREFIX'], 'yt')
+                self.assertEqual(config['VERSION'], 3)
+
+    def test_shared_backends(self):
+        """Кэш в памяти процесса не считается общим для воркеров."""
+        for url in ('locmem://', 'dummy://', ''):
+            with self.subTest(url=url):
+                self.assertFalse(is_shared(url))
+        for url in ('file:///var/tmp/yatube', 'redis://localhost:6379/1'):
+            with self.subTest(url=url):
+                self.assertTrue(is_shared(url))
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            parse_cache_url('ftp://cache')
+
+
+class SharedCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    def run_process(self, action):
+        env = dict(
+            os.environ,
+            CACHE_URL=f'file://{self.cache_dir}',
+            DJANGO_SETTINGS_MODULE='yatube.settings',
+            SECRET_KEY=settings.SECRET_KEY or 'test',
+            ALLOWED_HOSTS=','.join(settings.ALLOWED_HOSTS))
+        return subprocess.run(
+            [sys.executable, '-c', CACHE_SCRIPT, action],
+            cwd=settings.BASE_DIR, env=env, check=True,
+            stdout=subprocess.PIPE, universal_newlines=True).stdout.strip()
+
+    def test_processes_share_file_cache(self):
+        """Два процесса видят одни и те же записи файлового кэша."""
+        self.run_process('set')
+        self.assertEqual(self.run_process('get'), 'из первого процесса')
+
+
+REPLICA_SCRIPT = '''
+import sys
+from io import StringIO
+
+import django
+django.setup()
+from django.core.management import call_command
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment
+from posts.models import Post, User
+
+setup_test_environment()
+override_settings(PAGE_SHELL_CACHE=sys.argv[1] == "shell").enable()
+call_command("migrate", verbosity=0)
+author = User.objects.create_user("author", password="pass")
+Post.objects.create(text="Старый пост", author=author)
+call_command("sync_replicas", stdout=StringIO())
+Post.objects.create(text="Пост мимо реплики", author=author)
+
+guest = Client()
+writer = Client()
+writer.login(username="author", password="pass")
+
+
+def shows(client, text):
+    return text in client.get("/").content.decode()
+
+
+print(shows(guest, "Старый пост"), shows(guest, "Пост мимо реплики"))
+writer.post("/new/", {"text": "Свежий пост"})
+print(shows(guest, "Свежий пост"), shows(writer, "Свежий пост"))
+call_command("sync_replicas", stdout=StringIO())
+print(shows(Client(), "Свежий пост"), "ETag" in guest.get("/"))
+'''
+
+
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+
+    def run_script(self, mode):
+        env = dict(
+            os.environ,
+            DB_NAME=os.path.join(self.data_dir, 'primary.sqlite3'),
+            DB_REPLICAS=os.path.join(self.data_dir, 'replica.sqlite3'),
+            CACHE_URL=f'file://{os.path.join(self.data_dir, "cache")}',
+            SLOW_QUERY_LOG=os.path.join(self.data_dir, 'slow.log'),
+            DJANGO_SETTINGS_MODULE='yatube.settings',
+            SECRET_KEY=settings.SECRET_KEY or 'test',
+            ALLOWED_HOSTS=','.join(settings.ALLOWED_HOSTS))
+        output = subprocess.run(
+            [sys.executable, '-c', REPLICA_SCRIPT, mode],
+            cwd=settings.BASE_DIR, env=env, check=True,
+            stdout=subprocess.PIPE, universal_newlines=True).stdout
+        return output.split('\n')[-4:-1]
+
+    def test_reads_from_file_replica_with_stickiness(self):
+        """Гость читает с отставшей реплики, автор сразу видит свой пост."""
+        self.assertEqual(self.run_script('fragments'), [
+            'True False',
+            'False True',
+            # Кэш фрагментов не сохранил данные отставшей реплики,
+            # а страница с нее отдана без ETag
+            'True False',
+        ])
+
+    def test_page_shells_filled_from_primary(self):
+        """Общая оболочка страницы не собирается с отставшей реплики."""
+        self.assertEqual(self.run_script('shell'), [
+            'True True',
+            'True True',
+            'True True',
+        ])
+
+
+class PersistentConnectionTest(TransactionTestCase):
+    def check(self, usable):
+        connection.ensure_connection()
+        # Тестовая база SQLite в памяти не закрывается, поэтому
+        # проверяется сам вызов close()
+        with mock.patch.object(connection, 'is_usable',
+                               return_value=usable), \
+                mock.patch.object(connection, 'close') as close:
+            db_router.check_connections()
+        return close.called
+
+    def test_dead_connection_closed_before_request(self):
+        self.assertTrue(self.check(usable=False))
+
+    def test_live_connection_kept(self):
+        self.assertFalse(self.check(usable=True))
+
+
+class StickinessTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+        self.client.force_login(self.user)
+
+    def test_write_sets_sticky_cookie(self):
+        response = self.client.post(reverse('new_post'), {'text': 'Пост'})
+        self.assertIn(db_router.STICKY_COOKIE, response.cookies)
+        self.assertTrue(db_router.is_sticky(self.client.get('/').wsgi_request))
+
+    def test_read_does_not_stick(self):
+        response = self.client.get(reverse('index'))
+        self.assertNotIn(db_router.STICKY_COOKIE, response.cookies)
+
+    def test_primary_without_replicas(self):
+        """Без реплик чтения идут в основную базу."""
+        router = db_router.ReplicaRouter()
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_session_write_does_not_stick(self):
+        """Сохранение сессии не включает прилипание, запись поста — да."""
+        router = db_router.ReplicaRouter()
+        db_router._state.wrote = False
+        router.db_for_write(Session)
+        self.assertFalse(db_router._state.wrote)
+        router.db_for_write(Post)
+        self.assertTrue(db_router._state.wrote)
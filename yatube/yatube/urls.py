@@ -26,6 +26,8 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
+    path('metrics/', include('monitoring.urls', namespace='monitoring')),
+    path('api/v1/', include('api.urls', namespace='api')),
     path('', include('posts.urls')),
     path('about/', include('about.urls', namespace='about')),
 ]